@@ -12,6 +12,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.settings import settings
+
 # Get database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/juggler.db")
 
@@ -20,11 +22,13 @@ is_postgres = DATABASE_URL.startswith("postgresql")
 
 if is_postgres:
     # PostgreSQL configuration
+    # Sized for the sync handlers running on FastAPI's threadpool (40 threads by default)
     engine = create_engine(
         DATABASE_URL,
         pool_pre_ping=True,  # Verify connections before using
-        pool_size=5,         # Number of connections to maintain
-        max_overflow=10,     # Maximum overflow connections
+        pool_size=settings.DB_POOL_SIZE,          # Number of connections to maintain
+        max_overflow=settings.DB_MAX_OVERFLOW,    # Maximum overflow connections
+        pool_recycle=settings.DB_POOL_RECYCLE,    # Replace connections older than this (seconds)
         echo=False           # Set to True for SQL debugging
     )
     
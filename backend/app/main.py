@@ -4,13 +4,23 @@ Main FastAPI application for Juggler v3 with Context Engine
 Includes Phase C endpoints for context transparency, variant management, and provider health
 """
 
-from datetime import datetime
+import asyncio
+import logging
+import anyio
+import time
+import orjson
+from datetime import datetime, timezone
 from typing import Optional, List
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 
-from app.database import get_db, engine, Base
+from app.database import get_db, engine, Base, SessionLocal
 from app.models.user import User
 from app.models.chat import Conversation, Message
 from app.models.message_variants import MessageVariant
@@ -23,18 +33,31 @@ from app.models.schemas import (
     ProviderHealthResponse, ProvidersHealthResponse
 )
 from app.services.auth_service import auth_service, get_current_user
-from app.services.provider_service import get_provider_service
+from app.services.provider_service import (
+    ProviderService, get_provider_service, get_app_provider_service, close_provider_service
+)
 from app.services.context_orchestrator import context_orchestrator
 from app.settings import settings
 from app.providers.base import ContextPackage
 from app.routers import auth as auth_router
 from app.routers import config as config_router
 
+logger = logging.getLogger(__name__)
+
+# Whole-list validators/serializers: rows are converted in one pydantic-core pass each way
+_conversation_list = TypeAdapter(List[ConversationResponse])
+_message_list = TypeAdapter(List[MessageResponse])
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"}
+
 # Create FastAPI app
 app = FastAPI(
     title="Juggler AI Chat System",
     version="3.0.0",
-    description="Multi-model AI chat with Context Engine"
+    description="Multi-model AI chat with Context Engine",
+    # orjson renders the body; FastAPI still runs jsonable_encoder over plain return values first,
+    # so the hot list endpoints return ORJSONResponse themselves to skip that pass
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -46,6 +69,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conversation and message lists are repetitive JSON; skip compressing small bodies
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
@@ -56,12 +82,20 @@ app.include_router(config_router.router, prefix="/api/config", tags=["config"])
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
+    # Provider init runs blocking availability probes - keep them off the event loop
+    app.state.provider_service = await asyncio.to_thread(get_provider_service)
+    
     # Initialize Context Orchestrator
     if settings.ENABLE_CONTEXT_ENGINE and settings.is_postgres():
         await context_orchestrator.initialize()
-        print("[OK] Context Orchestrator initialized")
+        logger.info("Context Orchestrator initialized")
     else:
-        print("[INFO] Context Orchestrator disabled (requires PostgreSQL)")
+        logger.info("Context Orchestrator disabled (requires PostgreSQL)")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled provider connections on shutdown"""
+    await close_provider_service()
 
 @app.get("/")
 def read_root():
@@ -77,7 +111,8 @@ def read_root():
 async def send_message(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    provider_service: ProviderService = Depends(get_app_provider_service)
 ):
     """Send a message to the AI provider using Context Orchestrator if enabled"""
     
@@ -110,13 +145,11 @@ async def send_message(
                 variants=[MessageVariantResponse.from_orm(v) for v in variants]
             )
         except Exception as e:
-            print(f"Context Orchestrator error: {e}")
-            print("Falling back to direct provider call")
+            logger.error("Context Orchestrator error: %s", e)
+            logger.info("Falling back to direct provider call")
             db.rollback()
     
     # Original implementation (fallback or if Context Engine disabled)
-    provider_service = get_provider_service()
-    
     # Get or create conversation
     if request.conversation_id:
         conversation = db.query(Conversation).filter(
@@ -152,9 +185,6 @@ async def send_message(
         "content": request.message
     })
     
-    # Create context package
-    context = ContextPackage(messages=context_messages)
-    
     # Save user message
     user_message = Message(
         conversation_id=conversation.id,
@@ -169,26 +199,27 @@ async def send_message(
     try:
         # Send to provider
         provider_response = await provider_service.send_message(
-            request.provider,
-            context,
-            request.model
+            provider_name=request.provider,
+            model=request.model,
+            messages=context_messages
         )
+        completed_at = datetime.utcnow()
         
         # Save assistant response
         assistant_message = Message(
             conversation_id=conversation.id,
             role="assistant",
-            content=provider_response.response,
+            content=provider_response.content,
             provider=provider_response.provider,
             model=provider_response.model,
             tokens_input=provider_response.tokens_used.get('input', 0),
             tokens_output=provider_response.tokens_used.get('output', 0),
-            timestamp=datetime.utcnow()
+            timestamp=completed_at
         )
         db.add(assistant_message)
         
         # Update conversation
-        conversation.updated_at = datetime.utcnow()
+        conversation.updated_at = completed_at
         if provider_response.tokens_used:
             total_tokens = provider_response.tokens_used.get('input', 0) + provider_response.tokens_used.get('output', 0)
             conversation.total_tokens = (conversation.total_tokens or 0) + total_tokens
@@ -197,7 +228,7 @@ async def send_message(
         db.refresh(assistant_message)
         
         return ChatResponse(
-            response=provider_response.response,
+            response=provider_response.content,
             conversation_id=conversation.id,
             message_id=assistant_message.id,
             provider=provider_response.provider,
@@ -226,11 +257,117 @@ async def send_message(
         
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(payload: dict) -> bytes:
+    """One server-sent event frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+@app.post("/api/chat/stream")
+def stream_message(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    provider_service: ProviderService = Depends(get_app_provider_service)
+):
+    """
+    Send a message and stream the reply as server-sent events
+    Events: {"conversation_id"} first, then {"delta"} chunks, then {"done", "message_id"} or {"error"}
+    """
+    if not provider_service.get_provider(request.provider):
+        raise HTTPException(status_code=400, detail=f"Provider '{request.provider}' not available")
+    
+    # Get or create conversation
+    if request.conversation_id:
+        conversation = Conversation.get_by_id(db, request.conversation_id, current_user.id)
+        if not conversation:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+    else:
+        conversation = Conversation(
+            user_id=current_user.id,
+            title=request.message[:50] + "..." if len(request.message) > 50 else request.message
+        )
+        db.add(conversation)
+        db.flush()
+    conversation_id = conversation.id
+    
+    # Conversation history plus the new message
+    context_messages = [
+        {"role": role, "content": content}
+        for role, content in db.query(Message.role, Message.content).filter(
+            Message.conversation_id == conversation_id
+        ).order_by(Message.timestamp)
+    ]
+    context_messages.append({"role": "user", "content": request.message})
+    
+    db.add(Message(
+        conversation_id=conversation_id,
+        role="user",
+        content=request.message,
+        timestamp=datetime.utcnow()
+    ))
+    db.commit()
+    
+    async def events():
+        parts = []
+        error = None
+        try:
+            yield _sse({"conversation_id": conversation_id})
+            async for chunk in provider_service.stream_message(request.provider, request.model, context_messages):
+                parts.append(chunk)
+                yield _sse({"delta": chunk})
+        except Exception as e:
+            error = str(e)
+            logger.error("Streaming error from %s: %s", request.provider, e)
+            yield _sse({"error": error})
+        finally:
+            # Runs on completion, provider error and client disconnect alike; keep whatever arrived.
+            # The write goes to the threadpool to keep the loop free; the shield stops the disconnect
+            # cancellation from abandoning it
+            with anyio.CancelScope(shield=True):
+                message_id = await run_in_threadpool(_save_streamed_reply, conversation_id, request, "".join(parts), error)
+        
+        if error is None:
+            yield _sse({"done": True, "message_id": message_id})
+    
+    # identity encoding keeps GZipMiddleware from buffering the stream
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+def _save_streamed_reply(conversation_id: str, request: ChatRequest, content: str, error: Optional[str]) -> Optional[str]:
+    """Persist a streamed assistant reply (the request's session is closed once streaming starts)"""
+    if not content and error is None:
+        return None
+    
+    db = SessionLocal()
+    try:
+        completed_at = datetime.utcnow()
+        message = Message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=content or f"Error: {error}",
+            provider=request.provider,
+            model=request.model,
+            timestamp=completed_at
+        )
+        db.add(message)
+        db.flush()
+        message_id = message.id
+        db.query(Conversation).filter(Conversation.id == conversation_id).update(
+            {Conversation.updated_at: completed_at}, synchronize_session=False
+        )
+        db.commit()
+        return message_id
+    except Exception as e:
+        logger.error("Failed to save streamed reply for %s: %s", conversation_id, e)
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
 @app.post("/api/chat/rerun")
 async def rerun_message(
     request: MessageVariantRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    provider_service: ProviderService = Depends(get_app_provider_service)
 ):
     """
     Rerun a message with a different provider/model to generate a variant
@@ -243,10 +380,10 @@ async def rerun_message(
         ).first()
         
         if not original_message:
-            print(f"DEBUG: Message not found: {request.original_message_id}")
+            logger.debug("Message not found: %s", request.original_message_id)
             raise HTTPException(status_code=404, detail="Message not found")
         
-        print(f"DEBUG: Found message {request.original_message_id} in conversation {original_message.conversation_id}")
+        logger.debug("Found message %s in conversation %s", request.original_message_id, original_message.conversation_id)
         
         # Verify user owns the conversation
         conversation = db.query(Conversation).filter(
@@ -254,10 +391,10 @@ async def rerun_message(
             Conversation.user_id == current_user.id
         ).first()
         
-        print(f"DEBUG: Current user: {current_user.id}, Conversation user: {original_message.conversation_id if not conversation else 'found'}")
+        logger.debug("Current user: %s, Conversation user: %s", current_user.id, original_message.conversation_id if not conversation else 'found')
         
         if not conversation:
-            print(f"DEBUG: User {current_user.id} does not own conversation {original_message.conversation_id}")
+            logger.debug("User %s does not own conversation %s", current_user.id, original_message.conversation_id)
             raise HTTPException(status_code=403, detail="Unauthorized")
         
         # Get the context snapshot for this message
@@ -266,19 +403,18 @@ async def rerun_message(
         ).first()
         
         if not context_snapshot:
-            print(f"DEBUG: No context snapshot found for message {request.original_message_id}")
+            logger.debug("No context snapshot found for message %s", request.original_message_id)
             raise HTTPException(status_code=404, detail="Context snapshot not found - message may be from before Phase C was enabled")
         
         # Extract the context package from snapshot
-        import json
         snapshot_data = context_snapshot.snapshot_data
         if isinstance(snapshot_data, str):
-            snapshot_data = json.loads(snapshot_data)
+            snapshot_data = orjson.loads(snapshot_data)
         
         # Get messages from snapshot - handle both string and list
         messages = snapshot_data.get("messages", [])
         if isinstance(messages, str):
-            messages = json.loads(messages)
+            messages = orjson.loads(messages)
         
         context = ContextPackage(
             messages=messages,
@@ -287,8 +423,6 @@ async def rerun_message(
         )
         
         # Call the new provider with preserved context
-        provider_service = get_provider_service()
-        
         try:
             provider_response = await provider_service.send_message(
                 provider_name=request.provider,
@@ -326,19 +460,17 @@ async def rerun_message(
             }
             
         except Exception as e:
-            print(f"DEBUG: Provider error: {str(e)}")
+            logger.error("Provider error: %s", e)
             raise HTTPException(status_code=500, detail=f"Provider error: {str(e)}")
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"DEBUG: Rerun endpoint error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Rerun endpoint error: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 @app.post("/api/chat/variants/select")
-async def select_variant(
+def select_variant(
     request: MessageVariantSelectRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -400,27 +532,18 @@ async def select_variant(
         db.commit()
         
         return {
-            "new_message": MessageResponse(
-                id=new_message.id,
-                role=new_message.role,
-                content=new_message.content,
-                provider=new_message.provider,
-                model=new_message.model,
-                timestamp=new_message.timestamp.isoformat() if new_message.timestamp else None
-            ),
+            "new_message": MessageResponse.model_validate(new_message),
             "deactivated_message_id": request.original_message_id
         }
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"DEBUG: Select variant error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Select variant error: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 @app.get("/api/chat/messages/{message_id}/context")
-async def get_message_context(
+def get_message_context(
     message_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -455,15 +578,14 @@ async def get_message_context(
         raise HTTPException(status_code=404, detail="Context not found for this message")
     
     # Parse snapshot data
-    import json
     snapshot_data = snapshot.snapshot_data
     if isinstance(snapshot_data, str):
-        snapshot_data = json.loads(snapshot_data)
+        snapshot_data = orjson.loads(snapshot_data)
     
     # Parse metadata
     snapshot_metadata = snapshot.snapshot_metadata
     if isinstance(snapshot_metadata, str):
-        snapshot_metadata = json.loads(snapshot_metadata)
+        snapshot_metadata = orjson.loads(snapshot_metadata)
     
     # Convert to readable format
     messages = []
@@ -483,7 +605,7 @@ async def get_message_context(
     )
 
 @app.get("/api/providers/health")
-async def get_providers_health(
+def get_providers_health(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -512,45 +634,82 @@ async def get_providers_health(
             provider=health.provider,
             status=health.status,
             failure_count=health.failure_count,
-            last_failure_at=health.last_failure_at.isoformat() if health.last_failure_at else None,
-            opened_until=health.opened_until.isoformat() if health.opened_until else None,
+            last_failure_at=health.last_failure_at,
+            opened_until=health.opened_until,
             tokens_input_total=tokens_input_total,
             tokens_output_total=tokens_output_total,
-            updated_at=health.updated_at.isoformat() if health.updated_at else None
+            updated_at=health.updated_at
         )
     
     return ProvidersHealthResponse(providers=providers_health)
 
+def _encode_cursor(updated_at: datetime, conversation_id: str) -> str:
+    """Opaque keyset cursor for the conversation list"""
+    return f"{updated_at.isoformat()}|{conversation_id}"
+
+def _decode_cursor(cursor: str):
+    """Split a conversation list cursor back into (updated_at, id)"""
+    try:
+        updated_at, conversation_id = cursor.split("|", 1)
+        return datetime.fromisoformat(updated_at), conversation_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/api/chat/conversations")
-async def get_conversations(
+def get_conversations(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    limit: int = 50
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
 ):
-    """Get user's conversations"""
-    conversations = db.query(Conversation).filter(
+    """Get user's conversations, newest first (keyset-paginated via next_cursor)"""
+    # Count messages in a correlated subquery instead of lazy-loading every conversation's messages
+    message_count = select(func.count(Message.id)).where(
+        Message.conversation_id == Conversation.id
+    ).correlate(Conversation).scalar_subquery().label("message_count")
+    
+    rows = db.query(
+        Conversation.id,
+        Conversation.title,
+        Conversation.created_at,
+        Conversation.updated_at,
+        message_count
+    ).filter(
         Conversation.user_id == current_user.id
-    ).order_by(Conversation.updated_at.desc()).limit(limit).all()
+    )
     
-    return {
-        "conversations": [
-            ConversationResponse(
-                id=conv.id,
-                title=conv.title,
-                created_at=conv.created_at.isoformat() if conv.created_at else None,
-                updated_at=conv.updated_at.isoformat() if conv.updated_at else None,
-                message_count=len(conv.messages)
-            ) for conv in conversations
-        ]
-    }
+    if cursor:
+        cursor_updated_at, cursor_id = _decode_cursor(cursor)
+        rows = rows.filter(
+            tuple_(Conversation.updated_at, Conversation.id) < (cursor_updated_at, cursor_id)
+        )
+    
+    # Fetch one extra row to know whether another page exists
+    rows = rows.order_by(
+        Conversation.updated_at.desc(), Conversation.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].updated_at, rows[-1].id)
+    
+    # Returned as a response directly: plain dicts/datetimes go to orjson without jsonable_encoder
+    conversations = _conversation_list.validate_python(rows, from_attributes=True)
+    return ORJSONResponse({
+        "conversations": _conversation_list.dump_python(conversations),
+        "next_cursor": next_cursor
+    })
 
 @app.get("/api/chat/conversations/{conversation_id}/messages")
-async def get_messages(
+def get_messages(
     conversation_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    before: Optional[datetime] = None
 ):
-    """Get messages for a conversation"""
+    """Get messages for a conversation (optionally only the latest `limit` before `before`)"""
     # Verify conversation belongs to user
     conversation = db.query(Conversation).filter(
         Conversation.id == conversation_id,
@@ -560,40 +719,55 @@ async def get_messages(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    messages = db.query(Message).filter(
+    query = db.query(Message).filter(
         Message.conversation_id == conversation_id
-    ).order_by(Message.timestamp).all()
+    )
+    if before:
+        query = query.filter(Message.timestamp < before)
     
-    return {
-        "messages": [
-            MessageResponse(
-                id=msg.id,
-                role=msg.role,
-                content=msg.content,
-                provider=msg.provider,
-                model=msg.model,
-                timestamp=msg.timestamp.isoformat() if msg.timestamp else None
-            ) for msg in messages
-        ]
-    }
+    if limit:
+        # Latest page, returned in chronological order
+        messages = query.order_by(Message.timestamp.desc()).limit(limit).all()[::-1]
+    else:
+        messages = query.order_by(Message.timestamp).all()
+    
+    # Returned as a response directly: plain dicts/datetimes go to orjson without jsonable_encoder
+    messages = _message_list.validate_python(messages, from_attributes=True)
+    return ORJSONResponse({
+        "messages": _message_list.dump_python(messages)
+    })
 
 @app.get("/api/providers")
-async def get_providers():
+async def get_providers(provider_service: ProviderService = Depends(get_app_provider_service)):
     """Get available providers and their models"""
-    provider_service = get_provider_service()
     providers = await provider_service.get_available_providers()
     return {"providers": providers}
 
+# (epoch second, ISO string) - health is polled, so format the timestamp once per second
+_health_timestamp = (0, "")
+
+def _health_now() -> str:
+    """Current UTC time as naive ISO string (same shape as utcnow().isoformat()), cached at 1 second resolution"""
+    global _health_timestamp
+    now = int(time.time())
+    if _health_timestamp[0] != now:
+        _health_timestamp = (
+            now, datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat(timespec="microseconds")
+        )
+    return _health_timestamp[1]
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _health_now(),
         "database": "connected",
         "context_engine": settings.ENABLE_CONTEXT_ENGINE and settings.is_postgres()
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Dev launcher: "auto" picks uvloop/httptools when installed and falls back elsewhere (e.g. Windows);
+    # the production command in the README pins them explicitly
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
\ No newline at end of file
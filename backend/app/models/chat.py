@@ -6,7 +6,7 @@ Updated with Context Engine relationships
 import uuid
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship, Session
 from app.database import Base
 
@@ -73,6 +73,10 @@ class Conversation(Base):
 class Message(Base):
     """Message model"""
     __tablename__ = "messages"
+    # History reads filter by conversation and order by timestamp
+    __table_args__ = (
+        Index("ix_messages_conversation_timestamp", "conversation_id", "timestamp"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     conversation_id = Column(String(36), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
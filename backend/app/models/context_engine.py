@@ -5,7 +5,7 @@ Requires PostgreSQL with pgvector extension
 """
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.orm import relationship, Session
@@ -97,9 +97,10 @@ class RetrievalLog(Base):
         turn_id: int,
         retrieved_message_id: str,
         score: float,
-        reason: str
+        reason: str,
+        commit: bool = True
     ):
-        """Log a message retrieval"""
+        """Log a message retrieval (commit=False leaves the commit to the caller)"""
         log = cls(
             conversation_id=conversation_id,
             turn_id=turn_id,
@@ -108,7 +109,8 @@ class RetrievalLog(Base):
             reason=reason
         )
         db.add(log)
-        db.commit()
+        if commit:
+            db.commit()
         return log
 
 
@@ -133,9 +135,10 @@ class ContextSnapshot(Base):
         message_id: str,
         context_hash: str,
         snapshot_data: Dict[str, Any],
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        commit: bool = True
     ):
-        """Create a context snapshot"""
+        """Create a context snapshot (commit=False leaves the commit to the caller)"""
         snapshot = cls(
             generating_message_id=message_id,
             context_hash=context_hash,
@@ -143,8 +146,9 @@ class ContextSnapshot(Base):
             snapshot_metadata=metadata
         )
         db.add(snapshot)
-        db.commit()
-        db.refresh(snapshot)
+        if commit:
+            db.commit()
+            db.refresh(snapshot)
         return snapshot
     
     @classmethod
@@ -193,8 +197,6 @@ class ProviderHealth(Base):
     @classmethod
     def record_failure(cls, db: Session, provider: str, threshold: int = 5, timeout_seconds: int = 60):
         """Record a failed call and potentially open circuit"""
-        from datetime import timedelta
-        
         health = cls.get_status(db, provider)
         health.failure_count += 1
         health.last_failure_at = datetime.utcnow()
@@ -3,7 +3,7 @@
 from sqlalchemy import Column, String, JSON, DateTime, Boolean, Text
 from sqlalchemy.orm.attributes import flag_modified
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence
 from app.database import Base
 
 class ModelSelection(Base):
@@ -30,6 +30,19 @@ class ModelSelection(Base):
         
         return enabled
     
+    @classmethod
+    def get_enabled_models_many(cls, db, providers: Sequence[str]) -> Dict[str, List[str]]:
+        """Aktivierte Models mehrerer Provider mit einer Query"""
+        selections = db.query(cls).filter(cls.provider.in_(providers)).all()
+        
+        return {
+            selection.provider: [
+                model_id for model_id, info in (selection.available_models or {}).items()
+                if info.get('enabled', False)
+            ]
+            for selection in selections
+        }
+    
     @classmethod
     def get_all_models(cls, db, provider: str) -> Dict:
         """Gibt alle verfügbaren Models zurück für Config-Page"""
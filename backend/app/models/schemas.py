@@ -4,9 +4,13 @@ Pydantic schemas for request/response models
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from pydantic import BaseModel, EmailStr
 
+# Small closed sets are validated as Literal (set membership) rather than str patterns
+ProviderName = Literal["ollama", "groq", "anthropic"]
+HealthStatus = Literal["healthy", "degraded", "down"]
+
 
 # User schemas
 class UserBase(BaseModel):
@@ -62,7 +66,7 @@ class MessageVariantResponse(BaseModel):
 
 class MessageVariantRequest(BaseModel):
     original_message_id: str
-    provider: str
+    provider: ProviderName
     model: str
 
 
@@ -74,7 +78,7 @@ class MessageVariantSelectRequest(BaseModel):
 # Chat schemas
 class ChatRequest(BaseModel):
     message: str
-    provider: str
+    provider: ProviderName
     model: str
     conversation_id: Optional[str] = None
 
@@ -108,13 +112,13 @@ class ContextSnapshotResponse(BaseModel):
 # Provider Health schemas
 class ProviderHealthResponse(BaseModel):
     provider: str
-    status: str  # "healthy", "degraded", "down"
+    status: HealthStatus
     failure_count: int
-    last_failure_at: Optional[str] = None
-    opened_until: Optional[str] = None
+    last_failure_at: Optional[datetime] = None
+    opened_until: Optional[datetime] = None
     tokens_input_total: int = 0
     tokens_output_total: int = 0
-    updated_at: Optional[str] = None
+    updated_at: Optional[datetime] = None
 
 
 class ProvidersHealthResponse(BaseModel):
@@ -125,10 +129,13 @@ class ProvidersHealthResponse(BaseModel):
 class ConversationResponse(BaseModel):
     id: str
     title: str
-    created_at: Optional[str] = None
-    updated_at: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     message_count: int = 0
 
+    class Config:
+        from_attributes = True
+
 
 # Message schemas
 class MessageResponse(BaseModel):
@@ -137,23 +144,10 @@ class MessageResponse(BaseModel):
     content: str
     provider: Optional[str] = None
     model: Optional[str] = None
-    timestamp: Optional[str] = None
-
-
-# Config schemas
-class ConfigUpdate(BaseModel):
-    groq_api_key: Optional[str] = None
-    anthropic_api_key: Optional[str] = None
-    openai_api_key: Optional[str] = None
-    DELETE_groq_api_key: Optional[bool] = False
-    DELETE_anthropic_api_key: Optional[bool] = False
-    DELETE_openai_api_key: Optional[bool] = False
+    timestamp: Optional[datetime] = None
 
-
-class ConfigResponse(BaseModel):
-    groq_api_key: Optional[Dict[str, Any]] = None
-    anthropic_api_key: Optional[Dict[str, Any]] = None
-    openai_api_key: Optional[Dict[str, Any]] = None
+    class Config:
+        from_attributes = True
 
 
 # Provider schemas
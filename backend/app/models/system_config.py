@@ -1,7 +1,8 @@
 from sqlalchemy import Column, String, JSON, DateTime
 from sqlalchemy.sql import func
+from sqlalchemy.orm.attributes import flag_modified
 from app.database import Base
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -21,6 +22,12 @@ class SystemConfig(Base):
         config = db.query(cls).filter(cls.key == key).first()
         return config.value if config else None
 
+    @classmethod
+    def get_many(cls, db, keys: Sequence[str]) -> Dict[str, Any]:
+        """Get several config values in one query (missing keys are omitted)"""
+        configs = db.query(cls).filter(cls.key.in_(keys)).all()
+        return {config.key: config.value for config in configs}
+
     @classmethod
     def set(cls, db, key: str, value: Any) -> 'SystemConfig':
         """Set a config value"""
@@ -34,6 +41,25 @@ class SystemConfig(Base):
         db.commit()
         return config
 
+    @classmethod
+    def set_many(cls, db, values: Dict[str, Any]) -> None:
+        """Set several config values with one SELECT and one commit"""
+        if not values:
+            return
+        
+        existing = {config.key: config for config in db.query(cls).filter(cls.key.in_(list(values))).all()}
+        now = datetime.utcnow()
+        for key, value in values.items():
+            config = existing.get(key)
+            if config:
+                config.value = value
+                config.updated_at = now
+                # JSON column: make sure the UPDATE includes value even if the dict was mutated in place
+                flag_modified(config, "value")
+            else:
+                db.add(cls(key=key, value=value))
+        db.commit()
+
     @classmethod
     def delete(cls, db, key: str) -> bool:
         """Delete a config key"""
@@ -44,6 +70,15 @@ class SystemConfig(Base):
             return True
         return False
 
+    @classmethod
+    def delete_many(cls, db, keys: List[str]) -> List[str]:
+        """Delete several config keys with one DELETE; returns the keys that existed (in input order)"""
+        found = {key for (key,) in db.query(cls.key).filter(cls.key.in_(keys)).all()}
+        if found:
+            db.query(cls).filter(cls.key.in_(found)).delete(synchronize_session=False)
+            db.commit()
+        return [key for key in keys if key in found]
+
 
 # Pydantic Models für API
 
@@ -77,4 +112,4 @@ class ProviderConfigResponse(BaseModel):
     exists: bool
     active: bool = True
     masked: Optional[str] = None
-    last_used: Optional[str] = None
\ No newline at end of file
+    last_used: Optional[int] = None  # Unix epoch seconds
\ No newline at end of file
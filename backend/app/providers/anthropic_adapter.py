@@ -5,10 +5,14 @@ Anthropic (Claude) provider adapter
 from typing import Dict, List, Optional, Any, AsyncGenerator
 import logging
 import httpx
-from app.providers.base import BaseProvider, ContextPackage, ProviderResponse
+import orjson
+from app.providers.base import BaseProvider, ContextPackage, ProviderResponse, ProviderHTTPError, ERROR_BODY_LIMIT
 
 logger = logging.getLogger(__name__)
 
+# Anthropic only knows user/assistant; system messages are sent separately (None = skip)
+ROLE_MAP = {"user": "user", "assistant": "assistant", "system": None}
+
 
 class AnthropicAdapter(BaseProvider):
     """Adapter for Anthropic's Claude API"""
@@ -30,15 +34,15 @@ class AnthropicAdapter(BaseProvider):
     async def health_check(self) -> bool:
         """Check if Anthropic API is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/models",
-                    headers=self.headers,
-                    timeout=5.0
-                )
-                return response.status_code == 200
+            client = self.get_http_client()
+            response = await client.get(
+                f"{self.base_url}/models",
+                headers=self.headers,
+                timeout=5.0
+            )
+            return response.status_code == 200
         except Exception as e:
-            logger.warning(f"Anthropic availability check failed: {e}")
+            logger.warning("Anthropic availability check failed: %s", e)
             return False
     
     def is_available(self) -> bool:
@@ -52,7 +56,7 @@ class AnthropicAdapter(BaseProvider):
                 )
                 return response.status_code == 200
         except Exception as e:
-            logger.warning(f"Anthropic availability check failed: {e}")
+            logger.warning("Anthropic availability check failed: %s", e)
             return False
     
     async def list_models(self) -> List[Dict[str, str]]:
@@ -60,41 +64,43 @@ class AnthropicAdapter(BaseProvider):
         List available Claude models from Anthropic API
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/models",
-                    headers=self.headers,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                models = []
-                
-                # Parse response according to Anthropic API format
-                for model in data.get("data", []):
-                    model_id = model.get("id", "")
-                    display_name = model.get("display_name", model_id)
-                    
-                    models.append({
-                        "id": model_id,
-                        "name": display_name,
-                        "description": f"Anthropic Claude model: {display_name}"
-                    })
-                
-                return models
+            client = self.get_http_client()
+            response = await client.get(
+                f"{self.base_url}/models",
+                headers=self.headers,
+                timeout=10.0
+            )
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            models = []
+            
+            # Parse response according to Anthropic API format
+            for model in data.get("data", []):
+                model_id = model.get("id", "")
+                display_name = model.get("display_name", model_id)
                 
+                models.append({
+                    "id": model_id,
+                    "name": display_name,
+                    "description": f"Anthropic Claude model: {display_name}"
+                })
+            
+            return models
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"Anthropic API returned {e.response.status_code}: {e.response.text}")
-            raise Exception(f"Failed to fetch models from Anthropic API (HTTP {e.response.status_code})")
+            logger.error("Anthropic API returned %s: %s", e.response.status_code, e.response.text[:ERROR_BODY_LIMIT])
+            raise ProviderHTTPError(
+                f"Failed to fetch models from Anthropic API (HTTP {e.response.status_code})", e.response.status_code
+            ) from e
         except Exception as e:
-            logger.error(f"Error fetching Anthropic models: {e}")
+            logger.error("Error fetching Anthropic models: %s", e)
             raise Exception(f"Failed to fetch models from Anthropic: {str(e)}")
     
     async def send_message(self, context: ContextPackage, model: str) -> ProviderResponse:
         """Send message to Anthropic API"""
         # Convert messages to Anthropic format
-        messages = self._convert_messages(context.messages)
+        messages = self.serialize_context(context, model)
         
         # Build request
         request_body = {
@@ -109,69 +115,59 @@ class AnthropicAdapter(BaseProvider):
             request_body["system"] = context.system_prompt
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    headers=self.headers,
-                    json=request_body,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Extract response
-                content = data.get("content", [])
-                response_text = ""
-                if content and isinstance(content, list):
-                    response_text = content[0].get("text", "")
-                
-                # Calculate tokens
-                usage = data.get("usage", {})
-                tokens_input = usage.get("input_tokens", 0)
-                tokens_output = usage.get("output_tokens", 0)
-                
-                return ProviderResponse(
-                    content=response_text,
-                    model=model,
-                    provider="anthropic",
-                    tokens_used={
-                        "input": tokens_input,
-                        "output": tokens_output,
-                        "total": tokens_input + tokens_output
-                    }
-                )
-                
+            client = self.get_http_client()
+            response = await client.post(
+                f"{self.base_url}/messages",
+                headers=self.headers,
+                content=orjson.dumps(request_body),
+                timeout=30.0
+            )
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            
+            # Extract response
+            content = data.get("content", [])
+            response_text = ""
+            if content and isinstance(content, list):
+                response_text = content[0].get("text", "")
+            
+            # Calculate tokens
+            usage = data.get("usage", {})
+            tokens_input = usage.get("input_tokens", 0)
+            tokens_output = usage.get("output_tokens", 0)
+            
+            return ProviderResponse(
+                content=response_text,
+                model=model,
+                provider="anthropic",
+                tokens_used={
+                    "input": tokens_input,
+                    "output": tokens_output,
+                    "total": tokens_input + tokens_output
+                }
+            )
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"Anthropic API error: {e.response.text}")
-            raise Exception(f"Anthropic API error: {e.response.status_code}")
+            logger.error("Anthropic API error: %s", e.response.text[:ERROR_BODY_LIMIT])
+            raise ProviderHTTPError(f"Anthropic API error: {e.response.status_code}", e.response.status_code) from e
         except Exception as e:
-            logger.error(f"Error calling Anthropic API: {e}")
+            logger.error("Error calling Anthropic API: %s", e)
             raise
     
+    def _serialize_context(self, context: ContextPackage, model: str) -> List[Dict[str, str]]:
+        """Anthropic payload is the converted message list (system prompt is sent separately)"""
+        return self._convert_messages(context.messages)
+    
     def _convert_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Convert messages to Anthropic format"""
         converted = []
         
         for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            
-            # Anthropic uses 'user' and 'assistant' roles
-            if role in ["user", "assistant"]:
-                converted.append({
-                    "role": role,
-                    "content": content
-                })
-            elif role == "system":
-                # System messages handled separately
-                continue
-            else:
-                # Convert unknown roles to user
-                converted.append({
-                    "role": "user",
-                    "content": content
-                })
+            # Unknown roles are converted to user
+            role = ROLE_MAP.get(msg.get("role"), "user")
+            if role is not None:
+                converted.append({"role": role, "content": msg.get("content", "")})
         
         return converted
     
@@ -181,7 +177,7 @@ class AnthropicAdapter(BaseProvider):
         model: str
     ) -> AsyncGenerator[str, None]:
         """Stream a message response from Anthropic"""
-        messages = self._convert_messages(context_package.messages)
+        messages = self.serialize_context(context_package, model)
         
         request_body = {
             "model": model,
@@ -195,25 +191,27 @@ class AnthropicAdapter(BaseProvider):
             request_body["system"] = context_package.system_prompt
         
         try:
-            async with httpx.AsyncClient() as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/messages",
-                    headers=self.headers,
-                    json=request_body,
-                    timeout=30.0
-                ) as response:
-                    response.raise_for_status()
-                    
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            import json
-                            data = json.loads(line[6:])
-                            if data.get("type") == "content_block_delta":
-                                delta = data.get("delta", {})
-                                if delta.get("type") == "text_delta":
-                                    yield delta.get("text", "")
-                    
+            client = self.get_http_client()
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/messages",
+                headers=self.headers,
+                content=orjson.dumps(request_body),
+                timeout=30.0
+            ) as response:
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = orjson.loads(line[6:])
+                        if data.get("type") == "content_block_delta":
+                            delta = data.get("delta", {})
+                            if delta.get("type") == "text_delta":
+                                yield delta.get("text", "")
+                
+        except httpx.HTTPStatusError as e:
+            logger.error("Anthropic streaming API returned %s", e.response.status_code)
+            raise ProviderHTTPError(f"Anthropic API error: {e.response.status_code}", e.response.status_code) from e
         except Exception as e:
-            logger.error(f"Error streaming from Anthropic: {e}")
+            logger.error("Error streaming from Anthropic: %s", e)
             raise
\ No newline at end of file
@@ -3,12 +3,43 @@
 Base provider interface for Juggler v2
 Defines the contract all providers must implement
 """
+import asyncio
+import hashlib
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, AsyncGenerator
-from pydantic import BaseModel
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, AsyncGenerator, Tuple
+import httpx
+import orjson
 
+from app.providers.circuit_breaker import CircuitBreaker
+from app.providers.rate_limit import TokenBucket
 
-class ContextPackage(BaseModel):
+# Serialized payloads kept per provider (retries / multi-model fan-out)
+SERIALIZE_CACHE_SIZE = 128
+
+# Default number of concurrent upstream requests per provider
+DEFAULT_MAX_INFLIGHT = 32
+
+# A successful health probe is trusted for this long before probing again
+HEALTH_CACHE_SECONDS = 30.0
+HEALTH_PROBE_TIMEOUT = 2.0
+
+# Upstream error bodies are cut to this many characters in logs and exceptions
+ERROR_BODY_LIMIT = 512
+
+# Model lists change at human timescales - refetch at most this often
+MODELS_CACHE_SECONDS = 300.0
+
+# Connection pool for the shared per-provider HTTP client (HTTP/2 multiplexes over TLS).
+# Idle connections outlive the gap between chat turns instead of httpx's 5s default
+HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=128, keepalive_expiry=60.0)
+
+
+@dataclass(slots=True)
+class ContextPackage:
     """Package of context to send with a request"""
     messages: List[Dict[str, str]]
     system_prompt: Optional[str] = None
@@ -17,15 +48,41 @@ class ContextPackage(BaseModel):
     top_p: float = 1.0
     frequency_penalty: float = 0.0
     presence_penalty: float = 0.0
+    request_timeout: Optional[float] = None  # Seconds, falls back to the service default
+    _fingerprint: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def fingerprint(self) -> bytes:
+        """Stable content hash - packages are treated as immutable once built"""
+        if self._fingerprint is None:
+            canonical = orjson.dumps(
+                [
+                    self.messages, self.system_prompt, self.temperature, self.max_tokens,
+                    self.top_p, self.frequency_penalty, self.presence_penalty
+                ],
+                option=orjson.OPT_SORT_KEYS
+            )
+            self._fingerprint = hashlib.blake2b(canonical, digest_size=16).digest()
+        return self._fingerprint
 
 
-class ProviderResponse(BaseModel):
+@dataclass(slots=True)
+class ProviderResponse:
     """Standard response from a provider"""
     content: str
     model: str
     provider: str
-    tokens_used: Dict[str, int] = {"input": 0, "output": 0}
+    tokens_used: Dict[str, int] = field(default_factory=lambda: {"input": 0, "output": 0})
     raw_response: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None  # e.g. failover info
+
+
+class ProviderHTTPError(Exception):
+    """Upstream API answered with an error status (kept so callers can tell overload from bad requests)"""
+    
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class BaseProvider(ABC):
@@ -35,6 +92,65 @@ class BaseProvider(ABC):
         """Initialize provider with configuration"""
         self.config = config
         self.name = self.__class__.__name__.replace('Adapter', '').lower()
+        self._serialize_cache: "OrderedDict[Tuple[bytes, str], Any]" = OrderedDict()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._last_healthy_at = 0.0
+        self._health_probe: Optional[asyncio.Future] = None
+        self._models_cache: List[Dict[str, str]] = []
+        self._models_fetched_at = 0.0
+        self._models_fetch: Optional[asyncio.Future] = None
+        
+        # Client-side backpressure: in-flight cap plus optional requests/minute pacing
+        self._inflight = asyncio.Semaphore(config.get("max_inflight") or DEFAULT_MAX_INFLIGHT)
+        requests_per_minute = config.get("requests_per_minute")
+        self._bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        
+        # Per-instance breaker so one provider's outage never affects another
+        self.breaker = CircuitBreaker(
+            fail_threshold=config.get("breaker_threshold", 5),
+            recovery_seconds=config.get("breaker_recovery_seconds", 60.0)
+        )
+    
+    @asynccontextmanager
+    async def request_slot(self):
+        """Hold an in-flight slot (and a rate-limit token) for one upstream request"""
+        async with self._inflight:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            yield
+    
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Get the provider's pooled async HTTP client (created on first use)"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(http2=True, limits=HTTP_LIMITS)
+        return self._http_client
+    
+    async def close(self):
+        """Release the provider's HTTP connections"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    def serialize_context(self, context_package: ContextPackage, model: str) -> Any:
+        """
+        Get the provider-specific payload for a context package
+        Memoized per (package fingerprint, model) - callers must not mutate the result
+        """
+        key = (context_package.fingerprint, model)
+        payload = self._serialize_cache.get(key)
+        if payload is not None:
+            self._serialize_cache.move_to_end(key)
+            return payload
+        
+        payload = self._serialize_context(context_package, model)
+        self._serialize_cache[key] = payload
+        if len(self._serialize_cache) > SERIALIZE_CACHE_SIZE:
+            self._serialize_cache.popitem(last=False)
+        return payload
+    
+    def _serialize_context(self, context_package: ContextPackage, model: str) -> Any:
+        """Build the provider-specific payload, override if the provider needs conversion"""
+        return context_package.messages
     
     @abstractmethod
     async def send_message(
@@ -64,6 +180,64 @@ class BaseProvider(ABC):
         """Check if the provider is available and responding"""
         pass
     
+    async def get_models(self, refresh: bool = False) -> List[Dict[str, str]]:
+        """
+        Cached list_models() - fresh results for MODELS_CACHE_SECONDS, and the last
+        good list (stale) if a refetch fails or comes back empty
+        """
+        if not refresh and self._models_cache and time.monotonic() - self._models_fetched_at < MODELS_CACHE_SECONDS:
+            return self._models_cache
+        
+        # Single-flight: concurrent callers (refreshes included) share one in-flight fetch,
+        # and its result or error, instead of each hitting the API
+        if self._models_fetch is None:
+            self._models_fetch = asyncio.ensure_future(self._fetch_models())
+        return await asyncio.shield(self._models_fetch)
+    
+    async def _fetch_models(self) -> List[Dict[str, str]]:
+        """Run list_models() once and update the cache; stale list on failure if there is one"""
+        try:
+            models = await self.list_models()
+        except Exception:
+            if not self._models_cache:
+                raise
+            models = []
+        finally:
+            self._models_fetch = None
+        
+        if models:
+            self._models_cache = models
+            self._models_fetched_at = time.monotonic()
+        return self._models_cache
+    
+    async def check_health(self) -> bool:
+        """
+        Cached health check - answers from the last successful probe when recent,
+        otherwise joins (or starts) the single in-flight probe
+        """
+        if time.monotonic() - self._last_healthy_at < HEALTH_CACHE_SECONDS:
+            return True
+        
+        if self._health_probe is None:
+            self._health_probe = asyncio.ensure_future(self._probe_health())
+        # Shielded so one cancelled caller does not cancel the probe for the others
+        return await asyncio.shield(self._health_probe)
+    
+    async def _probe_health(self) -> bool:
+        """Run health_check() once with a short timeout and record the outcome"""
+        try:
+            healthy = await asyncio.wait_for(self.health_check(), HEALTH_PROBE_TIMEOUT)
+        except Exception:
+            healthy = False
+        finally:
+            self._health_probe = None
+        
+        if healthy:
+            self._last_healthy_at = time.monotonic()
+        else:
+            self.breaker.record_failure()
+        return healthy
+    
     def validate_model(self, model: str) -> bool:
         """Validate if a model is supported"""
         return True  # Default implementation, override if needed
\ No newline at end of file
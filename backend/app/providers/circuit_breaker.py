@@ -0,0 +1,99 @@
+# backend/app/providers/circuit_breaker.py
+"""
+In-process circuit breaker for provider calls
+Fails fast while a provider is down instead of paying a full timeout per request
+"""
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from app.services.backpressure import is_provider_failure
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited because the breaker is open"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Three-state breaker: CLOSED -> OPEN after N consecutive failures -> HALF_OPEN probe
+    Only errors for which is_failure is true count; anything else (e.g. a 404 for an unknown model)
+    propagates without touching the breaker state
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        fail_threshold: int = 5,
+        recovery_seconds: float = 60.0,
+        is_failure: Callable[[Exception], bool] = is_provider_failure
+    ):
+        self.fail_threshold = fail_threshold
+        self.recovery_seconds = recovery_seconds
+        self.is_failure = is_failure
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+    
+    def _before_call(self) -> bool:
+        """Reject the call if open; let exactly one probe through when half-open"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_seconds:
+                raise CircuitOpenError("Circuit open - provider temporarily disabled")
+            self.state = self.HALF_OPEN
+        
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError("Circuit half-open - probe request in flight")
+            self._probe_in_flight = True
+            return True
+        
+        return False
+    
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        self.state = self.CLOSED
+        self.failure_count = 0
+    
+    def record_failure(self):
+        """Count a failure and open the circuit once the threshold is reached"""
+        self.failure_count += 1
+        if self.state == self.HALF_OPEN or self.failure_count >= self.fail_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+    
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run an async call through the breaker"""
+        is_probe = self._before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            raise
+        finally:
+            if is_probe:
+                self._probe_in_flight = False
+        
+        self.record_success()
+        return result
+    
+    async def stream(self, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Run an async stream through the breaker; a provider failure mid-stream counts too"""
+        is_probe = self._before_call()
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            raise
+        finally:
+            if is_probe:
+                self._probe_in_flight = False
+        
+        self.record_success()
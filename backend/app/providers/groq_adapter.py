@@ -4,11 +4,41 @@ Groq provider adapter
 """
 from typing import Dict, List, Optional, Any, AsyncGenerator
 import logging
-from groq import Groq
-from app.providers.base import BaseProvider, ContextPackage, ProviderResponse
+import httpx
+from groq import AsyncGroq, Groq
+from app.providers.base import BaseProvider, ContextPackage, ProviderResponse, HTTP_LIMITS
 
 logger = logging.getLogger(__name__)
 
+# Groq uses standard OpenAI-style roles - anything else is sent as "user"
+ROLE_MAP = {"user": "user", "assistant": "assistant", "system": "system"}
+
+# One AsyncGroq client (and connection pool) per API key, shared by every adapter using that key;
+# adapters leave it open and close_shared_clients() closes them all at shutdown
+_CLIENT_CACHE: Dict[str, AsyncGroq] = {}
+
+
+def _get_client(api_key: str) -> AsyncGroq:
+    """Get the shared AsyncGroq client for an API key"""
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None or client.is_closed():
+        # HTTP/2 + keep-alive pool so concurrent chats multiplex over few connections
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=HTTP_LIMITS,
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        client = _CLIENT_CACHE[api_key] = AsyncGroq(api_key=api_key, http_client=http_client)
+    return client
+
+
+async def close_shared_clients():
+    """Close every cached AsyncGroq client (shutdown only - live adapters still use them)"""
+    clients = list(_CLIENT_CACHE.values())
+    _CLIENT_CACHE.clear()
+    for client in clients:
+        await client.close()
+
 
 class GroqAdapter(BaseProvider):
     """Adapter for Groq's API"""
@@ -20,33 +50,34 @@ class GroqAdapter(BaseProvider):
         if not self.api_key:
             raise ValueError("Groq API key is required")
         
-        # Initialize Groq client (v0.31.1)
-        self.client = Groq(api_key=self.api_key)
+        # Async Groq client (v0.31.1) - requests no longer block the event loop
+        self.client = _get_client(self.api_key)
     
     async def health_check(self) -> bool:
         """Check if Groq API is available"""
         try:
             # Try to list models as health check
-            models = self.client.models.list()
+            await self.client.models.list()
             return True
         except Exception as e:
-            logger.warning(f"Groq availability check failed: {e}")
+            logger.warning("Groq availability check failed: %s", e)
             return False
     
     def is_available(self) -> bool:
         """Synchronous availability check for initialization"""
         try:
-            models = self.client.models.list()
+            with Groq(api_key=self.api_key) as client:
+                client.models.list()
             return True
         except Exception as e:
-            logger.warning(f"Groq availability check failed: {e}")
+            logger.warning("Groq availability check failed: %s", e)
             return False
     
     async def list_models(self) -> List[Dict[str, str]]:
         """List available Groq models - returns dict format matching other adapters"""
         try:
             # Fetch models from API
-            models_response = self.client.models.list()
+            models_response = await self.client.models.list()
             models = []
             
             for model in models_response.data:
@@ -57,29 +88,19 @@ class GroqAdapter(BaseProvider):
                         "description": f"Groq model: {model.id}"
                     })
             
-            logger.info(f"Groq models fetched: {len(models)} models available")
-            return sorted(models, key=lambda x: x["id"]) if models else []
+            logger.info("Groq models fetched: %s models available", len(models))
+            return sorted(models, key=lambda x: x["id"])
             
         except Exception as e:
-            logger.error(f"Error listing Groq models: {e}")
+            logger.error("Error listing Groq models: %s", e)
             return []
     
     async def send_message(self, context: ContextPackage, model: str) -> ProviderResponse:
         """Send message to Groq API"""
-        
-        # Convert messages to Groq format
-        messages = self._convert_messages(context.messages)
-        
-        # Add system prompt if provided
-        if context.system_prompt:
-            messages.insert(0, {
-                "role": "system",
-                "content": context.system_prompt
-            })
+        messages = self.serialize_context(context, model)
         
         try:
-            # Groq SDK is synchronous, but we're in async context
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=context.temperature,
@@ -106,31 +127,28 @@ class GroqAdapter(BaseProvider):
             )
             
         except Exception as e:
-            logger.error(f"Error calling Groq API: {e}")
+            logger.error("Error calling Groq API: %s", e)
             raise
     
-    def _convert_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
-        """Convert messages to Groq format"""
-        converted = []
+    def _serialize_context(self, context: ContextPackage, model: str) -> List[Dict[str, str]]:
+        """Convert messages to Groq format, system prompt first"""
+        messages = self._convert_messages(context.messages)
         
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            
-            # Groq uses standard OpenAI-style roles
-            if role in ["user", "assistant", "system"]:
-                converted.append({
-                    "role": role,
-                    "content": content
-                })
-            else:
-                # Convert unknown roles to user
-                converted.append({
-                    "role": "user",
-                    "content": content
-                })
+        # Add system prompt if provided
+        if context.system_prompt:
+            messages.insert(0, {
+                "role": "system",
+                "content": context.system_prompt
+            })
         
-        return converted
+        return messages
+    
+    def _convert_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Convert messages to Groq format"""
+        return [
+            {"role": ROLE_MAP.get(msg.get("role"), "user"), "content": msg.get("content", "")}
+            for msg in messages
+        ]
     
     async def stream_message(
         self, 
@@ -138,19 +156,11 @@ class GroqAdapter(BaseProvider):
         model: str
     ) -> AsyncGenerator[str, None]:
         """Stream a message response from Groq"""
-        # Convert messages to Groq format
-        messages = self._convert_messages(context_package.messages)
-        
-        # Add system prompt if provided
-        if context_package.system_prompt:
-            messages.insert(0, {
-                "role": "system",
-                "content": context_package.system_prompt
-            })
+        messages = self.serialize_context(context_package, model)
         
         try:
             # Groq supports streaming
-            stream = self.client.chat.completions.create(
+            stream = await self.client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=context_package.temperature,
@@ -158,10 +168,10 @@ class GroqAdapter(BaseProvider):
                 stream=True
             )
             
-            for chunk in stream:
+            async for chunk in stream:
                 if chunk.choices[0].delta.content is not None:
                     yield chunk.choices[0].delta.content
                     
         except Exception as e:
-            logger.error(f"Error streaming from Groq: {e}")
+            logger.error("Error streaming from Groq: %s", e)
             raise
\ No newline at end of file
@@ -4,13 +4,25 @@ Ollama provider adapter for Juggler v2
 Handles communication with local Ollama instance
 """
 import httpx
-import json
+import logging
+import orjson
 from typing import Dict, List, Any, AsyncGenerator, Optional
-from .base import BaseProvider, ContextPackage, ProviderResponse
+from .base import BaseProvider, ContextPackage, ProviderResponse, ProviderHTTPError, ERROR_BODY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Request bodies are pre-encoded with orjson, so the content type is set explicitly
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 
 class OllamaAdapter(BaseProvider):
-    """Adapter for Ollama local models"""
+    """
+    Adapter for Ollama local models
+    
+    Ollama runs at most OLLAMA_NUM_PARALLEL requests per loaded model (and keeps
+    OLLAMA_MAX_LOADED_MODELS models in memory) - extra requests queue inside the
+    server. Pass the same value as "max_inflight" so the surplus waits here instead.
+    """
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize Ollama adapter with base URL"""
@@ -25,58 +37,42 @@ class OllamaAdapter(BaseProvider):
     ) -> ProviderResponse:
         """Send a message to Ollama and get a response"""
         
-        # Convert context package to Ollama format
-        messages = context_package.messages
-        
-        # Add system prompt if provided
-        if context_package.system_prompt:
-            messages = [
-                {"role": "system", "content": context_package.system_prompt}
-            ] + messages
-        
-        # Prepare request
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": False,
-            "options": {
-                "temperature": context_package.temperature,
-                "top_p": context_package.top_p,
-            }
-        }
-        
-        if context_package.max_tokens:
-            payload["options"]["num_predict"] = context_package.max_tokens
+        payload = self._build_payload(context_package, model, stream=False)
         
         # Send request
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Extract token usage if available
-                tokens_used = {
-                    "input": data.get("prompt_eval_count", 0),
-                    "output": data.get("eval_count", 0)
-                }
-                
-                return ProviderResponse(
-                    content=data["message"]["content"],
-                    model=model,
-                    provider="ollama",
-                    tokens_used=tokens_used,
-                    raw_response=data
-                )
-                
-            except httpx.HTTPStatusError as e:
-                raise Exception(f"Ollama API error: {e.response.status_code} - {e.response.text}")
-            except Exception as e:
-                raise Exception(f"Ollama connection error: {str(e)}")
+        client = self.get_http_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/api/chat",
+                content=orjson.dumps(payload),
+                headers=JSON_HEADERS,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            
+            # Extract token usage if available
+            tokens_used = {
+                "input": data.get("prompt_eval_count", 0),
+                "output": data.get("eval_count", 0)
+            }
+            
+            return ProviderResponse(
+                content=data["message"]["content"],
+                model=model,
+                provider="ollama",
+                tokens_used=tokens_used,
+                raw_response=data
+            )
+            
+        except httpx.HTTPStatusError as e:
+            raise ProviderHTTPError(
+                f"Ollama API error: {e.response.status_code} - {e.response.text[:ERROR_BODY_LIMIT]}",
+                e.response.status_code
+            ) from e
+        except Exception as e:
+            raise Exception(f"Ollama connection error: {str(e)}") from e
     
     async def stream_message(
         self, 
@@ -85,85 +81,106 @@ class OllamaAdapter(BaseProvider):
     ) -> AsyncGenerator[str, None]:
         """Stream a message response from Ollama"""
         
-        messages = context_package.messages
-        
-        if context_package.system_prompt:
-            messages = [
-                {"role": "system", "content": context_package.system_prompt}
-            ] + messages
+        payload = self._build_payload(context_package, model, stream=True)
         
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": True,
-            "options": {
-                "temperature": context_package.temperature,
-                "top_p": context_package.top_p,
-            }
+        client = self.get_http_client()
+        try:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/api/chat",
+                content=orjson.dumps(payload),
+                headers=JSON_HEADERS,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                
+                # NDJSON, one object per generated token - split raw bytes, skip str decoding
+                buffer = b""
+                async for chunk in response.aiter_bytes():
+                    buffer += chunk
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        if not line:
+                            continue
+                        try:
+                            data = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            continue
+                        if "message" in data and "content" in data["message"]:
+                            yield data["message"]["content"]
+                
+        except httpx.HTTPStatusError as e:
+            # Streamed responses are not read on error - only the status is available
+            raise ProviderHTTPError(f"Ollama API error: {e.response.status_code}", e.response.status_code) from e
+        except Exception as e:
+            raise Exception(f"Ollama connection error: {str(e)}") from e
+    
+    def _serialize_context(
+        self, 
+        context_package: ContextPackage,
+        model: str
+    ) -> List[Dict[str, str]]:
+        """Ollama takes the message list as-is, with the system prompt prepended"""
+        if not context_package.system_prompt:
+            return context_package.messages
+        return [{"role": "system", "content": context_package.system_prompt}, *context_package.messages]
+    
+    def _build_payload(
+        self,
+        context_package: ContextPackage,
+        model: str,
+        stream: bool
+    ) -> Dict[str, Any]:
+        """Build the /api/chat request body shared by send_message and stream_message"""
+        options = {
+            "temperature": context_package.temperature,
+            "top_p": context_package.top_p,
         }
-        
         if context_package.max_tokens:
-            payload["options"]["num_predict"] = context_package.max_tokens
+            options["num_predict"] = context_package.max_tokens
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/api/chat",
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
-                    
-                    async for line in response.aiter_lines():
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                if "message" in data and "content" in data["message"]:
-                                    yield data["message"]["content"]
-                            except json.JSONDecodeError:
-                                continue
-                                
-            except httpx.HTTPStatusError as e:
-                yield f"Error: {e.response.status_code}"
-            except Exception as e:
-                yield f"Error: {str(e)}"
+        return {
+            "model": model,
+            "messages": self.serialize_context(context_package, model),
+            "stream": stream,
+            "options": options
+        }
     
     async def list_models(self) -> List[Dict[str, str]]:
         """List available models from Ollama"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(f"{self.base_url}/api/tags")
-                response.raise_for_status()
-                data = response.json()
-                
-                # Extract model names and convert to dict format
-                models = []
-                for model in data.get("models", []):
-                    model_name = model["name"]
-                    models.append({
-                        "id": model_name,
-                        "name": model_name,
-                        "description": f"Ollama model: {model_name}"
-                    })
-                
-                return models
-                
-            except Exception as e:
-                print(f"Failed to fetch Ollama models: {e}")
-                return []
+        client = self.get_http_client()
+        try:
+            response = await client.get(f"{self.base_url}/api/tags", timeout=10.0)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            # Extract model names and convert to dict format
+            models = []
+            for model in data.get("models", []):
+                model_name = model["name"]
+                models.append({
+                    "id": model_name,
+                    "name": model_name,
+                    "description": f"Ollama model: {model_name}"
+                })
+            
+            return models
+            
+        except Exception as e:
+            logger.warning("Failed to fetch Ollama models: %s", e)
+            return []
     
     async def health_check(self) -> bool:
         """Check if Ollama is available"""
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            try:
-                response = await client.get(f"{self.base_url}/api/tags")
-                return response.status_code == 200
-            except Exception:
-                return False
+        client = self.get_http_client()
+        try:
+            response = await client.get(f"{self.base_url}/api/tags", timeout=5.0)
+            return response.status_code == 200
+        except Exception:
+            return False
     
     def is_available(self) -> bool:
         """Synchronous availability check for initialization"""
-        import httpx
         try:
             with httpx.Client(timeout=5.0) as client:
                 response = client.get(f"{self.base_url}/api/tags")
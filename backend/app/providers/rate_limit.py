@@ -0,0 +1,36 @@
+# backend/app/providers/rate_limit.py
+"""
+Client-side rate limiting for provider requests
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket: refills `rate` tokens per second, bursts up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    @classmethod
+    def per_minute(cls, requests_per_minute: int) -> "TokenBucket":
+        """Bucket sized to a requests-per-minute quota"""
+        return cls(rate=requests_per_minute / 60.0, capacity=requests_per_minute)
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
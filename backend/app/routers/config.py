@@ -1,21 +1,71 @@
 # backend/app/routers/config.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.system_config import SystemConfig, ProviderConfigSchema, ProviderConfigRequest, ProviderConfigResponse
 from app.models.user import User
 from app.services.auth_service import get_current_user
 from app.models.model_selection import ModelSelection
-from app.services.provider_service import get_provider_service
+from app.services.provider_service import ProviderService, get_app_provider_service
 from sqlalchemy.orm.attributes import flag_modified
-from typing import Dict, List
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+import asyncio
+import hashlib
 import logging
+import threading
+import orjson
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Providers shown on the config page, and those with model selection (order is the response order)
+CONFIG_PROVIDERS = ("groq", "anthropic", "openai", "ollama")
+MODEL_PROVIDERS = ("ollama", "groq", "anthropic")
+
+# Backwards compatibility: old request fields -> provider
+LEGACY_KEY_FIELDS = {
+    "groq_api_key": "groq",
+    "anthropic_api_key": "anthropic",
+    "openai_api_key": "openai"
+}
+DELETE_FLAG_FIELDS = {
+    "DELETE_groq_api_key": "groq",
+    "DELETE_anthropic_api_key": "anthropic",
+    "DELETE_openai_api_key": "openai"
+}
+
+# ProviderConfigRequest field -> (action, provider) for update_config
+CONFIG_FIELD_ACTIONS = {
+    **{provider: ("config", provider) for provider in CONFIG_PROVIDERS},
+    **{field: ("api_key", provider) for field, provider in LEGACY_KEY_FIELDS.items()},
+    **{field: ("delete", provider) for field, provider in DELETE_FLAG_FIELDS.items()}
+}
+EDITABLE_CONFIG_FIELDS = ("api_key", "active")
+
+# Stored keys that make up the GET / payload (current and legacy format)
+CONFIG_KEYS = (*CONFIG_PROVIDERS, *(f"{provider}_api_key" for provider in CONFIG_PROVIDERS))
+
+# (version, payload) for GET / - reused only while the stored version is unchanged
+_config_cache: Optional[tuple] = None
+
+# Providers with a background model refresh currently running; sync handlers reach it from
+# threadpool workers, so check-and-add happens under the lock
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+
+def invalidate_config_cache():
+    """Forget this worker's cached masked config (other workers notice the new version on their next GET)"""
+    global _config_cache
+    _config_cache = None
+
+
+NOT_CONFIGURED = ProviderConfigResponse(exists=False, active=False, masked=None, last_used=None)
+
 
 def mask_api_key(key: str) -> str:
     """Mask API key for display"""
@@ -24,130 +74,170 @@ def mask_api_key(key: str) -> str:
     return f"{key[:4]}...{key[-4:]}"
 
 
-def get_provider_config(db: Session, provider: str) -> Dict:
-    """Get provider configuration with backwards compatibility"""
-    # Try new schema first
-    config = SystemConfig.get(db, provider)
-    if config and isinstance(config, dict):
-        return config
-    
-    # Backwards compatibility: old format was just the API key string
-    old_key = SystemConfig.get(db, f"{provider}_api_key")
-    if old_key:
-        # Migrate to new format
-        new_config = {
-            "api_key": old_key,
-            "active": True,
-            "last_used": None
-        }
-        SystemConfig.set(db, provider, new_config)
-        SystemConfig.delete(db, f"{provider}_api_key")
-        return new_config
+def to_epoch(value) -> Optional[int]:
+    """Convert a stored last_used value (epoch, datetime or ISO string) to epoch seconds"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    # Naive values are stored as UTC (utcnow); .timestamp() would read them as local time
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def get_provider_configs(db: Session, providers: Sequence[str]) -> Dict[str, Optional[Dict]]:
+    """Get several provider configurations (one SELECT) with backwards compatibility"""
+    stored = SystemConfig.get_many(db, [*providers, *(f"{provider}_api_key" for provider in providers)])
+    result = {}
     
-    # Ollama special case (no API key needed)
-    if provider == "ollama":
-        return {"api_key": None, "active": True, "last_used": None}
+    for provider in providers:
+        # Try new schema first
+        config = stored.get(provider)
+        if config and isinstance(config, dict):
+            result[provider] = config
+            continue
+        
+        # Backwards compatibility: old format was just the API key string
+        old_key = stored.get(f"{provider}_api_key")
+        if old_key:
+            # Migrate to new format
+            new_config = {
+                "api_key": old_key,
+                "active": True,
+                "last_used": None
+            }
+            SystemConfig.set(db, provider, new_config)
+            SystemConfig.delete(db, f"{provider}_api_key")
+            result[provider] = new_config
+        elif provider == "ollama":
+            # Ollama special case (no API key needed)
+            result[provider] = {"api_key": None, "active": True, "last_used": None}
+        else:
+            result[provider] = None
     
-    return None
+    return result
+
+
+def get_provider_config(db: Session, provider: str) -> Dict:
+    """Get provider configuration with backwards compatibility"""
+    return get_provider_configs(db, [provider])[provider]
 
 
 def set_provider_config(db: Session, provider: str, config: Dict):
     """Set provider configuration"""
     SystemConfig.set(db, provider, config)
+    invalidate_config_cache()
 
 
-@router.get("/")
-async def get_config(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> Dict[str, ProviderConfigResponse]:
-    """
-    Get all provider configurations with masked API keys
-    """
-    providers = ["groq", "anthropic", "openai", "ollama"]
+def get_config_version(db: Session) -> tuple:
+    """Row count and latest updated_at of the config keys - one aggregate query, shared by all workers"""
+    count, updated_at = db.query(
+        func.count(SystemConfig.key), func.max(SystemConfig.updated_at)
+    ).filter(SystemConfig.key.in_(CONFIG_KEYS)).one()
+    return count, updated_at
+
+
+def build_config_payload(db: Session) -> Dict[str, ProviderConfigResponse]:
+    """Masked provider configurations as returned by GET /"""
+    configs = get_provider_configs(db, CONFIG_PROVIDERS)
     result = {}
     
-    for provider in providers:
-        config = get_provider_config(db, provider)
+    # Values are built here from stored config, so skip re-validating them (model_construct)
+    for provider in CONFIG_PROVIDERS:
+        config = configs[provider]
         
         if config:
-            result[provider] = ProviderConfigResponse(
-                exists=bool(config.get("api_key")),
+            api_key = config.get("api_key")
+            result[provider] = ProviderConfigResponse.model_construct(
+                exists=bool(api_key),
                 active=config.get("active", True),
-                masked=mask_api_key(config.get("api_key")) if config.get("api_key") else None,
-                last_used=config.get("last_used")
+                masked=mask_api_key(api_key) if api_key else None,
+                last_used=to_epoch(config.get("last_used"))
             )
         else:
-            result[provider] = ProviderConfigResponse(
-                exists=False,
-                active=False,
-                masked=None,
-                last_used=None
-            )
+            result[provider] = NOT_CONFIGURED
     
     return result
 
 
+@router.get("/")
+def get_config(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict[str, ProviderConfigResponse]:
+    """
+    Get all provider configurations with masked API keys
+    The ETag is derived from the stored config version, so it is the same on every worker;
+    answers 304 when If-None-Match matches, without building the payload
+    """
+    global _config_cache
+    version = get_config_version(db)
+    etag = '"%s"' % hashlib.blake2b(orjson.dumps(version), digest_size=8).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    if _config_cache is None or _config_cache[0] != version:
+        _config_cache = (version, build_config_payload(db))
+    
+    response.headers["ETag"] = etag
+    return _config_cache[1]
+
+
 @router.post("/")
-async def update_config(
+def update_config(
     request: ProviderConfigRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    provider_service: ProviderService = Depends(get_app_provider_service)
 ) -> Dict[str, List[str]]:
     """
     Update provider configurations
     Supports both new schema (ProviderConfigSchema) and old format (simple strings)
+    Changed keys or active flags are picked up by a provider refresh after the response
     """
+    existing = get_provider_configs(db, CONFIG_PROVIDERS)
+    # provider -> config to store; copies, so stored values are never mutated in place
+    updates = {}
     updated = []
-    deleted = []
+    deletions = []
     
-    # Handle new format (preferred)
-    for provider in ["groq", "anthropic", "openai", "ollama"]:
-        new_config = getattr(request, provider, None)
+    # Only fields the client actually sent; declaration order = new format, old format, delete flags
+    for field, value in request.model_dump(exclude_none=True).items():
+        action, provider = CONFIG_FIELD_ACTIONS[field]
+        if not value:
+            continue
         
-        if new_config:
-            # Get existing config
-            existing = get_provider_config(db, provider)
-            if not existing:
-                existing = {"api_key": None, "active": True, "last_used": None}
-            
-            # Update fields
-            if new_config.api_key is not None:
-                existing["api_key"] = new_config.api_key
-            if new_config.active is not None:
-                existing["active"] = new_config.active
-            
-            set_provider_config(db, provider, existing)
-            updated.append(provider)
-    
-    # Backwards compatibility: Handle old format (simple API key strings)
-    old_format_keys = {
-        "groq_api_key": "groq",
-        "anthropic_api_key": "anthropic",
-        "openai_api_key": "openai"
-    }
+        if action == "delete":
+            deletions.append(provider)
+            continue
+        
+        config = updates.setdefault(
+            provider, dict(existing[provider] or {"api_key": None, "active": True, "last_used": None})
+        )
+        if action == "config":
+            # New format: only the editable fields
+            config.update((key, value[key]) for key in EDITABLE_CONFIG_FIELDS if key in value)
+        else:
+            # Old format: simple API key string
+            config["api_key"] = value
+        updated.append(provider)
     
-    for field, provider in old_format_keys.items():
-        value = getattr(request, field, None)
-        if value:
-            existing = get_provider_config(db, provider)
-            if not existing:
-                existing = {"api_key": None, "active": True, "last_used": None}
-            existing["api_key"] = value
-            set_provider_config(db, provider, existing)
-            updated.append(provider)
+    # One SELECT + one commit for all updates
+    SystemConfig.set_many(db, updates)
     
     # Handle delete flags (backwards compatibility)
-    delete_flags = {
-        "DELETE_groq_api_key": "groq",
-        "DELETE_anthropic_api_key": "anthropic",
-        "DELETE_openai_api_key": "openai"
-    }
+    deleted = SystemConfig.delete_many(db, deletions)
     
-    for field, provider in delete_flags.items():
-        if getattr(request, field, False):
-            if SystemConfig.delete(db, provider):
-                deleted.append(provider)
+    if updates or deleted:
+        invalidate_config_cache()
+        background_tasks.add_task(provider_service.refresh_providers)
     
     return {
         "updated": updated,
@@ -156,7 +246,7 @@ async def update_config(
 
 
 @router.get("/models/enabled")
-async def get_enabled_models(
+def get_enabled_models(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -164,16 +254,17 @@ async def get_enabled_models(
     Get all enabled models across all ACTIVE providers
     This is FAST - reads only from DB, no API calls
     """
-    providers = ["ollama", "groq", "anthropic"]
+    configs = get_provider_configs(db, MODEL_PROVIDERS)
+    enabled_models = ModelSelection.get_enabled_models_many(db, MODEL_PROVIDERS)
     result = {}
     
-    for provider in providers:
+    for provider in MODEL_PROVIDERS:
         # Check if provider is active
-        config = get_provider_config(db, provider)
+        config = configs[provider]
         if not config or not config.get("active", True):
             continue  # Skip inactive providers
         
-        enabled = ModelSelection.get_enabled_models(db, provider)
+        enabled = enabled_models.get(provider)
         if enabled:
             result[provider] = {"models": enabled}
     
@@ -181,12 +272,18 @@ async def get_enabled_models(
 
 
 @router.get("/models/{provider}")
-async def get_provider_models(
+def get_provider_models(
     provider: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    provider_service: ProviderService = Depends(get_app_provider_service)
 ):
-    """Get available models for a provider"""
+    """
+    Get available models for a provider
+    Stale-while-revalidate: stored models are returned immediately and a stale or empty
+    list is refreshed from the provider API in the background
+    """
     # Check if provider is active
     config = get_provider_config(db, provider)
     if not config or not config.get("active", True):
@@ -197,63 +294,109 @@ async def get_provider_models(
         }
     
     models = ModelSelection.get_all_models(db, provider)
-    needs_refresh = ModelSelection.needs_refresh(db, provider)
-    
-    if not models:
-        return {
-            "models": {},
-            "needs_refresh": True
-        }
+    needs_refresh = not models or ModelSelection.needs_refresh(db, provider)
+    refreshing = needs_refresh and schedule_model_refresh(background_tasks, provider_service, provider)
     
     return {
-        "models": models,
-        "needs_refresh": needs_refresh
+        "models": models or {},
+        "needs_refresh": needs_refresh,
+        "refreshing": refreshing
     }
 
 
+async def fetch_and_store_models(db: Session, provider: str, adapter) -> int:
+    """Fetch the provider's model list and store it in ModelSelection"""
+    models = await adapter.get_models(refresh=True)
+    
+    model_dict = [
+        {
+            "id": model["id"],
+            "name": model.get("name", model["id"]),
+            "description": model.get("description", "")
+        }
+        for model in models
+    ]
+    
+    # Synchronous SQLAlchemy write - keep it off the event loop
+    await asyncio.to_thread(ModelSelection.update_available_models, db, provider, model_dict)
+    return len(models)
+
+
+async def refresh_models_in_background(provider: str, adapter):
+    """Background refresh with its own session; clears the in-flight marker when done"""
+    db = SessionLocal()
+    try:
+        count = await fetch_and_store_models(db, provider, adapter)
+        logger.info("Background refresh stored %s models for %s", count, provider)
+    except Exception as e:
+        logger.error("Background refresh failed for %s: %s", provider, e)
+    finally:
+        await asyncio.to_thread(db.close)
+        with _refreshing_lock:
+            _refreshing.discard(provider)
+
+
+def schedule_model_refresh(
+    background_tasks: BackgroundTasks,
+    provider_service: ProviderService,
+    provider: str
+) -> bool:
+    """Schedule a background model refresh unless one is running; False if the provider is not initialized"""
+    adapter = provider_service.providers.get(provider)
+    if adapter is None:
+        return False
+    
+    # Concurrent requests coalesce into the refresh that is already running
+    with _refreshing_lock:
+        if provider in _refreshing:
+            return True
+        _refreshing.add(provider)
+    
+    background_tasks.add_task(refresh_models_in_background, provider, adapter)
+    return True
+
+
 @router.post("/models/{provider}/refresh")
 async def refresh_provider_models(
     provider: str,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    background: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    provider_service: ProviderService = Depends(get_app_provider_service)
 ):
-    """Refresh model list from provider API"""
+    """
+    Refresh model list from provider API
+    With ?background=true the upstream call runs after the response (202)
+    """
     # Check if provider is active
     config = get_provider_config(db, provider)
     if not config or not config.get("active", True):
         raise HTTPException(status_code=400, detail="Provider is not active")
     
+    if provider not in provider_service.providers:
+        raise HTTPException(status_code=404, detail=f"Provider {provider} not initialized")
+    
+    adapter = provider_service.providers[provider]
+    
+    if background:
+        response.status_code = 202
+        status = "in_progress" if provider in _refreshing else "scheduled"
+        schedule_model_refresh(background_tasks, provider_service, provider)
+        return {"status": status}
+    
     try:
-        # Get provider service instance
-        provider_service = get_provider_service()
-        
-        # Get models from provider
-        if provider not in provider_service.providers:
-            raise HTTPException(status_code=404, detail=f"Provider {provider} not initialized")
-        
-        adapter = provider_service.providers[provider]
-        models = await adapter.list_models()
-        
-        # Store in database
-        model_dict = []
-        for model in models:
-            model_dict.append({
-                "id": model["id"],
-                "name": model.get("name", model["id"]),
-                "description": model.get("description", "")
-            })
-        
-        ModelSelection.update_available_models(db, provider, model_dict)
-        
-        return {"count": len(models)}
+        count = await fetch_and_store_models(db, provider, adapter)
+        return {"count": count}
         
     except Exception as e:
-        logger.error(f"Error refreshing models for {provider}: {str(e)}")
+        logger.error("Error refreshing models for %s: %s", provider, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/models/{provider}/selection")
-async def update_model_selection(
+def update_model_selection(
     provider: str,
     enabled_models: List[str],
     current_user: User = Depends(get_current_user),
@@ -2,7 +2,8 @@
 """Authentication service with JWT handling"""
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
@@ -18,6 +19,8 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+DECODE_ALGORITHMS = [ALGORITHM]
+DECODE_OPTIONS = {"require": ["exp", "sub"]}
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -57,7 +60,7 @@ class AuthService:
     @staticmethod
     def decode_token(token: str) -> Optional[TokenData]:
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = jwt.decode(token, SECRET_KEY, algorithms=DECODE_ALGORITHMS, options=DECODE_OPTIONS)
             user_id: str = payload.get("sub")
             username: str = payload.get("username")
             if user_id is None:
@@ -89,8 +92,8 @@ class AuthService:
         return db_user
 
 
-# FastAPI Dependency for protected routes
-async def get_current_user(
+# FastAPI Dependency for protected routes (sync - FastAPI runs it in the threadpool)
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
@@ -0,0 +1,92 @@
+# backend/app/services/backpressure.py
+"""
+Adaptive (AIMD) concurrency control for provider requests
+"""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+import httpx
+
+
+class AIMDController:
+    """
+    Concurrency limit that adapts to the provider: additive increase while the
+    recent mean latency stays under target, multiplicative decrease on overload
+    (timeouts, 429 and 5xx responses)
+    """
+    
+    def __init__(
+        self,
+        max_limit: int,
+        target_latency: float,
+        min_limit: int = 1,
+        window: int = 20,
+        increase: float = 1.0,
+        decrease: float = 0.5
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._latencies: deque = deque(maxlen=window)
+        self._cond = asyncio.Condition()
+    
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one admission slot for the duration of a request"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+    
+    def record_success(self, latency: float):
+        """Feed a completed request's latency; raise the limit once per full window under target"""
+        self._latencies.append(latency)
+        if len(self._latencies) < self._latencies.maxlen:
+            return
+        
+        if sum(self._latencies) / len(self._latencies) <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + self.increase)
+        self._latencies.clear()
+    
+    def record_overload(self):
+        """Back off after a timeout or rate-limit / server error"""
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self._latencies.clear()
+
+
+def is_overload(error: Exception) -> bool:
+    """
+    Whether an exception signals provider overload rather than a bad request
+    Adapters that wrap the transport error chain it, so the direct cause is checked too
+    """
+    for candidate in (error, error.__cause__):
+        if candidate is None:
+            continue
+        if isinstance(candidate, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException)):
+            return True
+        status_code = getattr(candidate, "status_code", None)
+        if status_code == 429 or (isinstance(status_code, int) and status_code >= 500):
+            return True
+    return False
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """
+    Whether an exception means the provider itself is unhealthy (overloaded, timing out or unreachable)
+    Client errors such as 400/401/403/404 say nothing about the provider and return False
+    """
+    if is_overload(error):
+        return True
+    return any(
+        isinstance(candidate, (httpx.TransportError, ConnectionError))
+        for candidate in (error, error.__cause__)
+    )
@@ -7,11 +7,11 @@ Manages intelligent context assembly, retrieval, and snapshots
 import hashlib
 import json
 import asyncio
+import logging
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from sentence_transformers import SentenceTransformer
-import numpy as np
 from sqlalchemy.orm import Session
 
 from app.models.chat import Message, Conversation
@@ -24,6 +24,9 @@ from app.models.context_engine import (
 from app.providers.base import ContextPackage, ProviderResponse
 from app.services.provider_service import get_provider_service
 from app.settings import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -62,9 +65,10 @@ class ContextOrchestrator:
     
     @property
     def embedding_model(self):
-        """Lazy load embedding model"""
+        """Lazy load embedding model (and sentence_transformers itself)"""
         if self._embedding_model is None:
-            print(f"Loading embedding model: {self.embedding_model_name}")
+            from sentence_transformers import SentenceTransformer
+            logger.info("Loading embedding model: %s", self.embedding_model_name)
             self._embedding_model = SentenceTransformer(self.embedding_model_name)
         return self._embedding_model
     
@@ -74,7 +78,7 @@ class ContextOrchestrator:
             # Start embedding worker
             asyncio.create_task(self._embedding_worker())
             self._is_initialized = True
-            print("Context Orchestrator initialized")
+            logger.info("Context Orchestrator initialized")
     
     async def process_message(
         self,
@@ -88,8 +92,8 @@ class ContextOrchestrator:
         """
         Main entry point for processing a message with intelligent context
         """
-        print(f"DEBUG Context Orchestrator: provider={provider}, model={model}, message_type={type(message)}, message={message[:50] if isinstance(message, str) else message}")
-        start_time = datetime.utcnow()
+        logger.debug("Context Orchestrator: provider=%s, model=%s, message_type=%s, message=%s", provider, model, type(message), message[:50] if isinstance(message, str) else message)
+        start_ns = time.perf_counter_ns()
         
         # 1. Get or create conversation
         conversation = self._get_or_create_conversation(db, conversation_id, user_id)
@@ -120,22 +124,23 @@ class ContextOrchestrator:
             db, provider, model, context_package
         )
         
-        # 7. Save user message
+        # 7. Save user message and assistant response (flushed together for their ids)
         user_message = self._save_message(
             db, conversation.id, "user", message, None, None, 0, 0
         )
-        
-        # 8. Save assistant response
         assistant_message = self._save_message(
             db, conversation.id, "assistant", response.content,
             response.provider, response.model,
             response.tokens_used.get('input', 0),
             response.tokens_used.get('output', 0)
         )
+        db.flush()
+        user_message_id, assistant_message_id = user_message.id, assistant_message.id
+        conversation_ref = conversation.id
         
-        # 9. Save context snapshot
+        # 8. Save context snapshot
         self._save_context_snapshot(
-            db, assistant_message.id, context_hash, context_package, {
+            db, assistant_message_id, context_hash, context_package, {
                 'provider': response.provider,
                 'model': response.model,
                 'temperature': context_package.temperature,
@@ -143,27 +148,31 @@ class ContextOrchestrator:
             }
         )
         
-        # 10. Queue messages for embedding generation
-        await self._embedding_queue.put((user_message.id, message))
-        await self._embedding_queue.put((assistant_message.id, response.content))
-        
-        # 11. Log retrievals if any
+        # 9. Log retrievals if any
         if retrieved_messages:
             turn_id = len(recent_messages) + 1
             for msg, score in retrieved_messages:
                 RetrievalLog.log_retrieval(
-                    db, conversation.id, turn_id, msg.id, score,
-                    f"Semantic similarity: {score:.3f}"
+                    db, conversation_ref, turn_id, msg.id, score,
+                    f"Semantic similarity: {score:.3f}",
+                    commit=False
                 )
         
+        # 10. One commit for the whole turn
+        db.commit()
+        
+        # 11. Queue messages for embedding generation
+        await self._embedding_queue.put((user_message_id, message))
+        await self._embedding_queue.put((assistant_message_id, response.content))
+        
         # Calculate latency
-        latency_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+        latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         return ProcessedResponse(
             response=response.content,
             context_hash=context_hash,
-            conversation_id=conversation.id,
-            message_id=assistant_message.id,
+            conversation_id=conversation_ref,
+            message_id=assistant_message_id,
             provider_used=response.provider,
             model_used=response.model,
             tokens=response.tokens_used,
@@ -181,7 +190,7 @@ class ContextOrchestrator:
                 Conversation.user_id == user_id
             ).first()
             if conv:
-                print(f"DEBUG: Found existing conversation {conv.id}")
+                logger.debug("Found existing conversation %s", conv.id)
                 return conv
         
         # Create new conversation
@@ -192,7 +201,7 @@ class ContextOrchestrator:
         db.add(conv)
         db.commit()
         db.refresh(conv)
-        print(f"DEBUG: Created new conversation with ID: {conv.id}, user_id: {conv.user_id}")
+        logger.debug("Created new conversation with ID: %s, user_id: %s", conv.id, conv.user_id)
         return conv
     
     def _get_recent_messages(
@@ -268,12 +277,17 @@ class ContextOrchestrator:
         
         # Implement token counting and truncation
         # (1 token ≈ 4 characters)
-        total_chars = sum(len(msg["content"]) for msg in context_messages)
-        if total_chars > max_tokens * 4:
-            # Truncate older messages if needed
-            while total_chars > max_tokens * 4 and len(context_messages) > 1:
-                removed = context_messages.pop(0)
-                total_chars -= len(removed["content"])
+        # Keep the longest suffix that fits (always at least the current message)
+        budget = max_tokens * 4
+        start = len(context_messages) - 1
+        suffix_chars = len(context_messages[start]["content"])
+        while start > 0:
+            suffix_chars += len(context_messages[start - 1]["content"])
+            if suffix_chars > budget:
+                break
+            start -= 1
+        if start:
+            context_messages = context_messages[start:]
         
         return ContextPackage(
             messages=context_messages,
@@ -327,7 +341,7 @@ class ContextOrchestrator:
             return response
             
         except Exception as e:
-            print(f"Context Orchestrator error: {e}")
+            logger.error("Context Orchestrator error: %s", e)
             # Record failure
             ProviderHealth.record_failure(db, provider)
             
@@ -346,26 +360,12 @@ class ContextOrchestrator:
         """
         Failover to a backup provider when primary fails
         """
-        # Get list of available providers
-        providers = await get_provider_service().get_available_providers()
-        
-        # Try each provider in order
-        for backup_provider in providers:
-            if backup_provider == failed_provider:
-                continue
-            
+        for backup_provider, model in await self._fallback_candidates(failed_provider):
             health = ProviderHealth.get_status(db, backup_provider)
             if not health.is_available():
                 continue
             
             try:
-                # Get first available model for backup provider
-                models = providers[backup_provider].get('models', [])
-                if not models:
-                    continue
-                
-                model = models[0] if isinstance(models[0], str) else models[0].get('id')
-                
                 response = await get_provider_service().send_message(
                     provider_name=backup_provider,
                     model=model,
@@ -387,6 +387,29 @@ class ContextOrchestrator:
         # If all providers fail, raise error
         raise Exception(f"All providers failed. Original error from {failed_provider}: {error}")
     
+    async def _fallback_candidates(self, failed_provider: str) -> List[Tuple[str, str]]:
+        """
+        (provider, model) pairs to try after a failure - the configured fallback chain,
+        or the first model of every other available provider
+        """
+        if settings.PROVIDER_FALLBACK_CHAIN:
+            candidates = []
+            for entry in settings.PROVIDER_FALLBACK_CHAIN:
+                provider, _, model = entry.partition(":")
+                if provider != failed_provider and model:
+                    candidates.append((provider, model))
+            return candidates
+        
+        providers = await get_provider_service().get_available_providers()
+        candidates = []
+        for provider, info in providers.items():
+            models = info.get('models', [])
+            if provider == failed_provider or not models:
+                continue
+            model = models[0] if isinstance(models[0], str) else models[0].get('id')
+            candidates.append((provider, model))
+        return candidates
+    
     def _save_message(
         self,
         db: Session,
@@ -398,8 +421,8 @@ class ContextOrchestrator:
         tokens_input: int,
         tokens_output: int
     ) -> Message:
-        """Save a message to the database"""
-        print(f"DEBUG _save_message: conv_id={conversation_id}, role={role}, provider={provider}")
+        """Add a message to the session - the caller flushes/commits"""
+        logger.debug("_save_message: conv_id=%s, role=%s, provider=%s", conversation_id, role, provider)
         message = Message(
             conversation_id=conversation_id,
             role=role,
@@ -411,9 +434,6 @@ class ContextOrchestrator:
             timestamp=datetime.utcnow()
         )
         db.add(message)
-        db.commit()
-        db.refresh(message)
-        print(f"DEBUG _save_message saved: id={message.id}, conv_id={message.conversation_id}")
         return message
     
     def _save_context_snapshot(
@@ -432,7 +452,8 @@ class ContextOrchestrator:
                 "temperature": context_package.temperature,
                 "max_tokens": context_package.max_tokens
             },
-            metadata
+            metadata,
+            commit=False
         )
     
     async def _embedding_worker(self):
@@ -451,21 +472,20 @@ class ContextOrchestrator:
                 
                 # Save to database
                 # Note: This needs proper session handling in production
-                from app.database import SessionLocal
                 db = SessionLocal()
                 try:
                     MessageEmbedding.create(
                         db, message_id, embedding.tolist(), self.embedding_model_name
                     )
-                    print(f"Generated embedding for message {message_id}")
+                    logger.debug("Generated embedding for message %s", message_id)
                 except Exception as e:
-                    print(f"Error saving embedding for message {message_id}: {e}")
+                    logger.error("Error saving embedding for message %s: %s", message_id, e)
                     db.rollback()
                 finally:
                     db.close()
                     
             except Exception as e:
-                print(f"Error in embedding worker: {e}")
+                logger.error("Error in embedding worker: %s", e)
                 await asyncio.sleep(1)  # Brief pause before retrying
 
 
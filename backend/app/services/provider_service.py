@@ -3,19 +3,30 @@
 Provider service for managing AI providers
 Updated: Support für Ollama, Groq und Anthropic with Active/Inactive flag
 """
-from typing import Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from typing import AsyncGenerator, Dict, Optional
+import asyncio
+import hashlib
 import logging
+import sys
+import time
+from fastapi import Request
 from sqlalchemy.orm import Session
 
-from app.providers.base import BaseProvider, ContextPackage, ProviderResponse
+from app.providers.base import BaseProvider, ContextPackage, ProviderResponse, DEFAULT_MAX_INFLIGHT
+from app.services.backpressure import AIMDController, is_overload
 from app.providers.ollama_adapter import OllamaAdapter
-from app.providers.groq_adapter import GroqAdapter
 from app.settings import settings
 from app.database import get_db
 from app.models.system_config import SystemConfig
 
 logger = logging.getLogger(__name__)
 
+# Responses at or below this temperature are treated as deterministic and cached
+DETERMINISTIC_TEMPERATURE = 0.1
+
 
 class ProviderService:
     """Service for managing AI providers with shared API keys"""
@@ -23,7 +34,9 @@ class ProviderService:
     def __init__(self):
         """Initialize provider service"""
         self.providers: Dict[str, BaseProvider] = {}
-        self._initialize_providers()
+        self._response_cache: "OrderedDict[str, ProviderResponse]" = OrderedDict()
+        self._controllers: Dict[str, AIMDController] = {}
+        self.providers = self._build_providers()
     
     def _get_provider_config(self, db: Session, provider: str) -> Optional[Dict]:
         """
@@ -52,13 +65,32 @@ class ProviderService:
             # Delete old format
             db.delete(old_config)
             db.commit()
-            logger.info(f"Migrated {provider} config to new format")
+            logger.info("Migrated %s config to new format", provider)
             return new_config
         
         return None
     
-    def _initialize_providers(self):
-        """Initialize available providers based on configuration"""
+    def _request_limits(self) -> Dict:
+        """Concurrency / quota settings shared by the cloud providers"""
+        return {
+            "max_inflight": settings.PROVIDER_MAX_INFLIGHT,
+            "requests_per_minute": settings.PROVIDER_REQUESTS_PER_MINUTE,
+            **self._breaker_config()
+        }
+    
+    def _breaker_config(self) -> Dict:
+        """Circuit breaker settings shared by all providers"""
+        return {
+            "breaker_threshold": settings.CIRCUIT_BREAKER_THRESHOLD,
+            "breaker_recovery_seconds": settings.CIRCUIT_BREAKER_TIMEOUT
+        }
+    
+    def _build_providers(self) -> Dict[str, BaseProvider]:
+        """Initialize available providers based on configuration (blocking: reads the DB and probes)"""
+        providers: Dict[str, BaseProvider] = {}
+        
+        # (name, adapter) pairs whose availability is probed together below
+        candidates = []
         
         # Get database session for config
         db = next(get_db())
@@ -72,15 +104,13 @@ class ProviderService:
             if ollama_config.get("active", True) and settings.OLLAMA_BASE_URL:
                 try:
                     ollama = OllamaAdapter({
-                        "base_url": settings.OLLAMA_BASE_URL
+                        "base_url": settings.OLLAMA_BASE_URL,
+                        "max_inflight": settings.OLLAMA_NUM_PARALLEL,
+                        **self._breaker_config()
                     })
-                    if ollama.is_available():
-                        self.providers["ollama"] = ollama
-                        logger.info(f"✅ Ollama provider initialized at {settings.OLLAMA_BASE_URL}")
-                    else:
-                        logger.warning("⚠️ Ollama configured but not available")
+                    candidates.append(("ollama", ollama))
                 except Exception as e:
-                    logger.error(f"❌ Failed to initialize Ollama: {e}")
+                    logger.error("❌ Failed to initialize Ollama: %s", e)
             else:
                 logger.info("ℹ️ Ollama is disabled in configuration")
             
@@ -88,16 +118,14 @@ class ProviderService:
             groq_config = self._get_provider_config(db, "groq")
             if groq_config and groq_config.get("api_key") and groq_config.get("active", True):
                 try:
+                    from app.providers.groq_adapter import GroqAdapter
                     groq = GroqAdapter({
-                        "api_key": groq_config["api_key"]
+                        "api_key": groq_config["api_key"],
+                        **self._request_limits()
                     })
-                    if groq.is_available():
-                        self.providers["groq"] = groq
-                        logger.info("✅ Groq provider initialized")
-                    else:
-                        logger.warning("⚠️ Groq API key provided but provider not available")
+                    candidates.append(("groq", groq))
                 except Exception as e:
-                    logger.error(f"❌ Failed to initialize Groq: {e}")
+                    logger.error("❌ Failed to initialize Groq: %s", e)
             elif groq_config and not groq_config.get("active", True):
                 logger.info("ℹ️ Groq is disabled in configuration")
             else:
@@ -110,17 +138,14 @@ class ProviderService:
                     # Anthropic Adapter importieren
                     from app.providers.anthropic_adapter import AnthropicAdapter
                     anthropic = AnthropicAdapter({
-                        "api_key": anthropic_config["api_key"]
+                        "api_key": anthropic_config["api_key"],
+                        **self._request_limits()
                     })
-                    if anthropic.is_available():
-                        self.providers["anthropic"] = anthropic
-                        logger.info("✅ Anthropic provider initialized")
-                    else:
-                        logger.warning("⚠️ Anthropic API key provided but provider not available")
+                    candidates.append(("anthropic", anthropic))
                 except ImportError:
                     logger.warning("⚠️ Anthropic adapter not found - needs to be created")
                 except Exception as e:
-                    logger.error(f"❌ Failed to initialize Anthropic: {e}")
+                    logger.error("❌ Failed to initialize Anthropic: %s", e)
             elif anthropic_config and not anthropic_config.get("active", True):
                 logger.info("ℹ️ Anthropic is disabled in configuration")
             else:
@@ -129,7 +154,30 @@ class ProviderService:
         finally:
             db.close()
         
-        logger.info(f"Provider initialization complete. Active: {list(self.providers.keys())}")
+        # Availability checks are blocking HTTP calls with 5s timeouts; run them side by side
+        # so startup waits for the slowest provider rather than the sum of all of them
+        if candidates:
+            with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+                availability = list(pool.map(self._probe_available, [adapter for _, adapter in candidates]))
+            
+            for (name, adapter), available in zip(candidates, availability):
+                if available:
+                    providers[name] = adapter
+                    logger.info("✅ %s provider initialized", name)
+                else:
+                    logger.warning("⚠️ %s configured but not available", name)
+        
+        logger.info("Provider initialization complete. Active: %s", list(providers.keys()))
+        return providers
+    
+    @staticmethod
+    def _probe_available(provider: BaseProvider) -> bool:
+        """Synchronous availability check that never raises"""
+        try:
+            return provider.is_available()
+        except Exception as e:
+            logger.error("❌ Availability check for %s failed: %s", provider.name, e)
+            return False
     
     async def send_message(
         self,
@@ -152,33 +200,138 @@ class ProviderService:
             **kwargs  # temperature, max_tokens, etc.
         )
         
-        return await provider.send_message(context, model)
+        # Identical deterministic requests are answered from the response cache
+        cache_key = self._response_cache_key(provider_name, model, context)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                return deepcopy(cached)
+        
+        if settings.ENABLE_CIRCUIT_BREAKER:
+            # Raises CircuitOpenError without touching the network while the provider is down
+            response = await provider.breaker.call(self._send, provider, context, model)
+        else:
+            response = await self._send(provider, context, model)
+        
+        if cache_key is not None:
+            self._response_cache[cache_key] = deepcopy(response)
+            if len(self._response_cache) > settings.PROVIDER_RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        
+        return response
     
-    def get_provider(self, name: str) -> Optional[BaseProvider]:
-        """Get a provider by name"""
-        return self.providers.get(name)
+    async def stream_message(
+        self,
+        provider_name: str,
+        model: str,
+        messages: list,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response chunk by chunk from the specified provider"""
+        
+        provider = self.get_provider(provider_name)
+        if not provider:
+            raise ValueError(f"Provider '{provider_name}' not available or disabled")
+        
+        context = ContextPackage(
+            messages=messages,
+            system_prompt=system_prompt,
+            **kwargs  # temperature, max_tokens, etc.
+        )
+        
+        stream = self._stream(provider, context, model)
+        if settings.ENABLE_CIRCUIT_BREAKER:
+            stream = provider.breaker.stream(stream)
+        
+        async for chunk in stream:
+            yield chunk
     
-    async def get_available_providers(self) -> Dict:
-        """Get information about available providers"""
-        result = {}
+    def _response_cache_key(
+        self,
+        provider_name: str,
+        model: str,
+        context: ContextPackage
+    ) -> Optional[str]:
+        """SHA-256 cache key for deterministic requests, None if the response must not be cached"""
+        if settings.PROVIDER_RESPONSE_CACHE_SIZE <= 0 or context.temperature > DETERMINISTIC_TEMPERATURE:
+            return None
         
-        for name, provider in self.providers.items():
+        digest = hashlib.sha256(f"{provider_name}\0{model}\0".encode("utf-8"))
+        digest.update(context.fingerprint)
+        return digest.hexdigest()
+    
+    async def _send(
+        self,
+        provider: BaseProvider,
+        context: ContextPackage,
+        model: str
+    ) -> ProviderResponse:
+        """Send one request to a provider inside its concurrency slot, retrying timeouts"""
+        timeout = context.request_timeout or settings.PROVIDER_REQUEST_TIMEOUT
+        controller = self._controller(provider)
+        
+        for attempt in range(settings.PROVIDER_MAX_RETRIES + 1):
             try:
-                # Use async health_check instead of is_available
-                is_available = await provider.health_check()
-                models = await provider.list_models() if is_available else []
+                async with controller.slot(), provider.request_slot():
+                    started = time.monotonic()
+                    response = await asyncio.wait_for(provider.send_message(context, model), timeout)
+                controller.record_success(time.monotonic() - started)
+                return response
+            except asyncio.TimeoutError:
+                controller.record_overload()
+                if attempt == settings.PROVIDER_MAX_RETRIES:
+                    raise TimeoutError(f"{provider.name} did not respond within {timeout}s") from None
                 
-                result[name] = {
-                    "available": is_available,
-                    "models": models
-                }
+                logger.warning("%s timed out after %ss, retrying (%s)", provider.name, timeout, attempt + 1)
+                await asyncio.sleep(0.5 * 2 ** attempt)
             except Exception as e:
-                logger.error(f"Error checking provider {name}: {e}")
-                result[name] = {
-                    "available": False,
-                    "models": [],
-                    "error": str(e)
-                }
+                if is_overload(e):
+                    controller.record_overload()
+                raise
+    
+    async def _stream(
+        self,
+        provider: BaseProvider,
+        context: ContextPackage,
+        model: str
+    ) -> AsyncGenerator[str, None]:
+        """Stream from a provider, holding its concurrency slot until the stream ends or is closed"""
+        controller = self._controller(provider)
+        
+        async with controller.slot(), provider.request_slot():
+            started = time.monotonic()
+            try:
+                async for chunk in provider.stream_message(context, model):
+                    yield chunk
+            except Exception as e:
+                if is_overload(e):
+                    controller.record_overload()
+                raise
+        
+        controller.record_success(time.monotonic() - started)
+    
+    def _controller(self, provider: BaseProvider) -> AIMDController:
+        """Adaptive concurrency limit for a provider, capped at its configured max in-flight"""
+        controller = self._controllers.get(provider.name)
+        if controller is None:
+            controller = self._controllers[provider.name] = AIMDController(
+                max_limit=provider.config.get("max_inflight") or DEFAULT_MAX_INFLIGHT,
+                target_latency=settings.PROVIDER_TARGET_LATENCY
+            )
+        return controller
+    
+    def get_provider(self, name: str) -> Optional[BaseProvider]:
+        """Get a provider by name"""
+        return self.providers.get(name)
+    
+    async def get_available_providers(self) -> Dict:
+        """Get information about available providers (all providers are probed concurrently)"""
+        # Snapshot, since refresh_providers may swap the dict while the probes run
+        providers = dict(self.providers)
+        infos = await asyncio.gather(*(self._describe_provider(name, provider) for name, provider in providers.items()))
+        result = dict(zip(providers, infos))
         
         # Add placeholders for non-initialized providers
         all_providers = ["ollama", "groq", "anthropic"]
@@ -191,11 +344,48 @@ class ProviderService:
             
         return result
     
-    def refresh_providers(self):
+    async def close(self):
+        """Close the HTTP connection pools of all providers"""
+        for provider in self.providers.values():
+            await provider.close()
+    
+    async def _describe_provider(self, name: str, provider: BaseProvider) -> Dict:
+        """Availability and model list for one provider"""
+        try:
+            # Cached async health check instead of is_available
+            is_available = await provider.check_health()
+            models = await provider.get_models() if is_available else []
+            
+            return {
+                "available": is_available,
+                "models": models
+            }
+        except Exception as e:
+            logger.error("Error checking provider %s: %s", name, e)
+            return {
+                "available": False,
+                "models": [],
+                "error": str(e)
+            }
+    
+    async def refresh_providers(self):
         """Refresh provider configuration (z.B. nach API Key Update oder Active/Inactive Change)"""
         logger.info("Refreshing providers...")
-        self.providers.clear()
-        self._initialize_providers()
+        # Availability probes are blocking, same as at startup; the current providers keep serving meanwhile
+        providers = await asyncio.to_thread(self._build_providers)
+        
+        # Unchanged providers keep their adapter, so in-flight requests, breaker state and caches survive
+        for name, adapter in list(providers.items()):
+            current = self.providers.get(name)
+            if current is not None and current.config == adapter.config:
+                providers[name] = current
+                await adapter.close()
+        
+        # Swap in one assignment, then release the adapters that were replaced or removed
+        previous, self.providers = self.providers, providers
+        for name, adapter in previous.items():
+            if providers.get(name) is not adapter:
+                await adapter.close()
 
 
 # Global provider service instance
@@ -207,4 +397,20 @@ def get_provider_service() -> ProviderService:
     global _provider_service
     if _provider_service is None:
         _provider_service = ProviderService()
-    return _provider_service
\ No newline at end of file
+    return _provider_service
+
+def get_app_provider_service(request: Request) -> ProviderService:
+    """FastAPI dependency: the instance stored on app.state at startup"""
+    provider_service = getattr(request.app.state, "provider_service", None)
+    return provider_service if provider_service is not None else get_provider_service()
+
+
+async def close_provider_service():
+    """Close the provider service connections, if it was ever created"""
+    if _provider_service is not None:
+        await _provider_service.close()
+    
+    # Shared Groq SDK clients outlive single adapters (only loaded if Groq was ever configured)
+    groq_adapter = sys.modules.get("app.providers.groq_adapter")
+    if groq_adapter is not None:
+        await groq_adapter.close_shared_clients()
@@ -27,6 +27,21 @@ class Settings(BaseSettings):
         default="sqlite:///./data/juggler.db",
         env="DATABASE_URL"
     )
+    DB_POOL_SIZE: int = Field(
+        default=20,
+        env="DB_POOL_SIZE",
+        description="Persistent PostgreSQL connections per worker"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=10,
+        env="DB_MAX_OVERFLOW",
+        description="Extra connections allowed above the pool size under bursts"
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=3600,
+        env="DB_POOL_RECYCLE",
+        description="Seconds after which a pooled connection is replaced"
+    )
     
     # CORS
     CORS_ORIGINS: List[str] = Field(
@@ -39,6 +54,11 @@ class Settings(BaseSettings):
         default="http://localhost:11434",
         env="OLLAMA_BASE_URL"
     )
+    OLLAMA_NUM_PARALLEL: int = Field(
+        default=4,
+        env="OLLAMA_NUM_PARALLEL",
+        description="Concurrent requests sent to Ollama - match the server's OLLAMA_NUM_PARALLEL"
+    )
     GROQ_API_KEY: Optional[str] = Field(default=None, env="GROQ_API_KEY")
     ANTHROPIC_API_KEY: Optional[str] = Field(default=None, env="ANTHROPIC_API_KEY")
     OPENAI_API_KEY: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -100,6 +120,49 @@ class Settings(BaseSettings):
         description="Seconds to wait before retrying after circuit opens"
     )
     
+    # Provider Request Settings
+    PROVIDER_MAX_INFLIGHT: int = Field(
+        default=32,
+        env="PROVIDER_MAX_INFLIGHT",
+        description="Maximum concurrent requests per cloud provider"
+    )
+    
+    PROVIDER_REQUESTS_PER_MINUTE: int = Field(
+        default=0,
+        env="PROVIDER_REQUESTS_PER_MINUTE",
+        description="Requests per minute quota per cloud provider (0 = unlimited)"
+    )
+    
+    PROVIDER_REQUEST_TIMEOUT: float = Field(
+        default=60.0,
+        env="PROVIDER_REQUEST_TIMEOUT",
+        description="Seconds before a provider request is abandoned"
+    )
+    
+    PROVIDER_MAX_RETRIES: int = Field(
+        default=1,
+        env="PROVIDER_MAX_RETRIES",
+        description="Retries for provider requests that timed out"
+    )
+    
+    PROVIDER_TARGET_LATENCY: float = Field(
+        default=15.0,
+        env="PROVIDER_TARGET_LATENCY",
+        description="Mean request latency (seconds) below which a provider's concurrency limit grows again"
+    )
+    
+    PROVIDER_RESPONSE_CACHE_SIZE: int = Field(
+        default=1024,
+        env="PROVIDER_RESPONSE_CACHE_SIZE",
+        description="Cached responses for deterministic (temperature <= 0.1) requests, 0 disables"
+    )
+    
+    PROVIDER_FALLBACK_CHAIN: List[str] = Field(
+        default=[],
+        env="PROVIDER_FALLBACK_CHAIN",
+        description="Ordered 'provider:model' fallbacks tried when a provider fails (empty = first available model)"
+    )
+    
     # Performance Settings
     ENABLE_CONTEXT_ENGINE: bool = Field(
         default=True,